@@ -0,0 +1,194 @@
+import argparse
+import time
+
+import numpy as np
+
+from compact import CompactPosition, PIECE_CLASSES, PIECE_CODES, SIZE
+from engine import PIECE_VALUES, DEFAULT_VALUE
+from fen import iter_epd
+from pieces import Pawn, Rook, Knight, Bishop, Queen, King, Rabbit, Dog, Cat
+
+CODE_COUNT = len(PIECE_CLASSES)
+PAWN, KING = PIECE_CODES[Pawn], PIECE_CODES[King]
+MOBILITY_WEIGHTS = {Knight: 4, Bishop: 3, Rook: 2, Queen: 1, Rabbit: 3, Dog: 3, Cat: 2}
+KING_SHIELD_WEIGHT = 8
+KING_DANGER_WEIGHT = 6
+FLIP = np.arange(64) ^ 56
+
+
+def _piece_values():
+    values = np.zeros(CODE_COUNT, dtype=np.int32)
+    for piece_class, code in PIECE_CODES.items():
+        values[code] = 0 if piece_class is King else PIECE_VALUES.get(piece_class, DEFAULT_VALUE)
+    return values
+
+
+def _piece_square_bonus():
+    # Те же позиционные поправки, что и в engine.evaluate, для белых фигур.
+    table = np.zeros((CODE_COUNT, 64), dtype=np.int32)
+    for square in range(64):
+        row, col = divmod(square, 8)
+        advance = max(row - 1, 0)
+        table[PAWN, square] = 5 * advance + (10 if advance and col in (3, 4) else 0)
+        for piece_class, code in PIECE_CODES.items():
+            if piece_class not in (Pawn, King):
+                table[code, square] = 10 if 2 <= row <= 5 and 2 <= col <= 5 else 0
+    return table
+
+
+def _build_static_table():
+    # static[байт кода, клетка] — материал плюс позиционная поправка со знаком цвета;
+    # черные фигуры (байты 256 - k) берут зеркальную клетку.
+    values = _piece_values()
+    bonus = _piece_square_bonus()
+    table = np.zeros((256, 64), dtype=np.int32)
+    for code in range(1, CODE_COUNT):
+        table[code] = values[code] + bonus[code]
+        table[256 - code] = -(values[code] + bonus[code][FLIP])
+    return table
+
+
+def _build_reach():
+    # reach[байт кода, клетка] — битовая маска клеток, до которых фигура достает на пустой доске.
+    reach = np.zeros((256, 64), dtype=np.uint64)
+    for piece_class, code in PIECE_CODES.items():
+        for (row, col), targets in piece_class.leap_table.items():
+            squares = set(targets) | {target for ray in piece_class.ray_table[(row, col)] for target in ray}
+            mask = sum(1 << (target_row * 8 + target_col) for target_row, target_col in squares)
+            reach[code, row * 8 + col] = reach[256 - code, row * 8 + col] = mask
+    return reach
+
+
+def _build_mobility_weights():
+    weights = np.zeros(256, dtype=np.int32)
+    for piece_class, weight in MOBILITY_WEIGHTS.items():
+        weights[PIECE_CODES[piece_class]] = weight
+        weights[256 - PIECE_CODES[piece_class]] = -weight
+    return weights
+
+
+def _build_king_zones():
+    near = np.zeros(64, dtype=np.uint64)
+    wide = np.zeros(64, dtype=np.uint64)
+    for square in range(64):
+        row, col = divmod(square, 8)
+        for target in range(64):
+            distance = max(abs(row - target // 8), abs(col - target % 8))
+            if distance == 1:
+                near[square] |= np.uint64(1 << target)
+            if 1 <= distance <= 2:
+                wide[square] |= np.uint64(1 << target)
+    return near, wide
+
+
+STATIC = _build_static_table()
+REACH = _build_reach()
+MOBILITY = _build_mobility_weights()
+KING_NEAR, KING_WIDE = _build_king_zones()
+SQUARES = np.arange(64)
+POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+
+def _bitboards(mask):
+    # Булев массив (N, 64) -> массив (N,) uint64, бит i соответствует клетке i.
+    return np.packbits(mask, axis=1, bitorder="little").view("<u8")[:, 0]
+
+
+def _popcount(values):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values).astype(np.int64)
+    return POPCOUNT[np.ascontiguousarray(values).view(np.uint8)].reshape(*values.shape, 8).sum(axis=-1, dtype=np.int64)
+
+
+def pack_boards(boards):
+    """Упаковывает доски в массивы кодов фигур и очереди хода.
+
+    Args:
+        boards (iterable): Объекты Board.
+
+    Returns:
+        tuple: (массив (N, 64) int8: +k — белая фигура, -k — черная, 0 — пусто;
+        массив (N,) int8: 1 — ходят белые, -1 — черные).
+    """
+    return pack_positions(CompactPosition.from_board(board).to_bytes() for board in boards)
+
+
+def pack_positions(positions):
+    """Упаковывает позиции в формате CompactPosition.to_bytes в массивы кодов и очереди хода."""
+    data = np.frombuffer(b"".join(positions), dtype=np.uint8).reshape(-1, SIZE)
+    codes = data[:, :64].view(np.int8)
+    sides = np.where(data[:, 64] == 0, 1, -1).astype(np.int8)
+    return codes, sides
+
+
+def evaluate_batch(codes, sides=None, mobility=True, king_safety=True):
+    """Оценивает сразу много позиций векторными операциями NumPy.
+
+    Учитываются материал и позиционные поправки (как в engine.evaluate),
+    подвижность (число пустых клеток, до которых фигура достает на пустой доске)
+    и безопасность короля (свои пешки рядом и фигуры соперника в двух клетках).
+
+    Args:
+        codes (ndarray): Массив (N, 64) int8 кодов фигур из pack_boards/pack_positions.
+        sides (ndarray, optional): Очередь хода (N,); если задана, оценка дается для ходящего.
+        mobility (bool): Учитывать подвижность.
+        king_safety (bool): Учитывать безопасность короля.
+
+    Returns:
+        ndarray: Оценки (N,) int32 в сотых долях пешки (за белых или за ходящего).
+    """
+    codes = np.asarray(codes, dtype=np.int8)
+    raw = codes.view(np.uint8)
+    index = raw.astype(np.intp) * 64 + SQUARES
+    scores = np.take(STATIC, index).sum(axis=1, dtype=np.int64)
+    if mobility:
+        empty = _bitboards(codes == 0)
+        reachable = _popcount(np.take(REACH, index) & empty[:, None])
+        scores += (reachable * np.take(MOBILITY, raw)).sum(axis=1)
+    if king_safety:
+        for color_sign in (1, -1):
+            own_kings = codes == color_sign * KING
+            king_square = own_kings.argmax(axis=1)
+            shield = _popcount(KING_NEAR[king_square] & _bitboards(codes == color_sign * PAWN))
+            attackers = (codes * -color_sign > 0) & (codes != -color_sign * PAWN) & (codes != -color_sign * KING)
+            danger = _popcount(KING_WIDE[king_square] & _bitboards(attackers))
+            safety = KING_SHIELD_WEIGHT * shield - KING_DANGER_WEIGHT * danger
+            scores += color_sign * np.where(own_kings.any(axis=1), safety, 0)
+    scores = scores.astype(np.int32)
+    return scores if sides is None else scores * sides
+
+
+def evaluate_epd(source, chunk_size=65536, **options):
+    """Оценивает позиции из файла EPD порциями по chunk_size.
+
+    Yields:
+        ndarray: Оценки очередной порции за ходящего игрока.
+    """
+    chunk = []
+    for _, board, _ in iter_epd(source):
+        chunk.append(CompactPosition.from_board(board).to_bytes())
+        if len(chunk) == chunk_size:
+            yield evaluate_batch(*pack_positions(chunk), **options)
+            chunk = []
+    if chunk:
+        yield evaluate_batch(*pack_positions(chunk), **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетная оценка позиций из файла EPD.")
+    parser.add_argument("path", help="файл EPD")
+    parser.add_argument("--chunk", type=int, default=65536, help="позиций в порции")
+    args = parser.parse_args()
+
+    count = 0
+    start = time.perf_counter()
+    for scores in evaluate_epd(args.path, args.chunk):
+        count += len(scores)
+        for score in scores:
+            print(score)
+    total = time.perf_counter() - start
+    print(f"Позиций: {count}, {total:.3f} c, {count / total if total else 0:.0f} поз/с")
+
+
+if __name__ == "__main__":
+    main()
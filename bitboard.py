@@ -0,0 +1,291 @@
+from board import Board
+from pieces import Pawn, Rook, Knight, Bishop, Queen, King, Rabbit, Dog, Cat
+
+NORTH, SOUTH, EAST, WEST = (1, 0), (-1, 0), (0, 1), (0, -1)
+NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST = (1, 1), (1, -1), (-1, 1), (-1, -1)
+ROOK_DIRECTIONS = (NORTH, SOUTH, EAST, WEST)
+BISHOP_DIRECTIONS = (NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST)
+POSITIVE_DIRECTIONS = {NORTH, EAST, NORTH_EAST, NORTH_WEST}
+
+
+def square(row, col):
+    """Возвращает номер клетки (0-63) по строке и столбцу."""
+    return row * 8 + col
+
+
+def bit(row, col):
+    """Возвращает битовую маску клетки."""
+    return 1 << (row * 8 + col)
+
+
+def iter_squares(bb):
+    """Перебирает клетки битовой доски в порядке возрастания номеров.
+
+    Args:
+        bb (int): Битовая доска.
+
+    Yields:
+        tuple: Кортеж (row, col) для каждого установленного бита.
+    """
+    while bb:
+        low = bb & -bb
+        sq = low.bit_length() - 1
+        yield divmod(sq, 8)
+        bb ^= low
+
+
+def _leap_bitboards(leap_table):
+    """Переводит таблицу прыжков фигуры (см. Piece.leap_table) в список из 64 битовых досок."""
+    table = []
+    for sq in range(64):
+        bb = 0
+        for row, col in leap_table[divmod(sq, 8)]:
+            bb |= bit(row, col)
+        table.append(bb)
+    return table
+
+
+def _ray_table(direction):
+    dr, dc = direction
+    table = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        bb = 0
+        row, col = row + dr, col + dc
+        while 0 <= row < 8 and 0 <= col < 8:
+            bb |= bit(row, col)
+            row, col = row + dr, col + dc
+        table.append(bb)
+    return table
+
+
+KING_ATTACKS = _leap_bitboards(King.leap_table)
+KNIGHT_ATTACKS = _leap_bitboards(Knight.leap_table)
+RABBIT_ATTACKS = _leap_bitboards(Rabbit.leap_table)
+PAWN_ATTACKS = {color: _leap_bitboards(table) for color, table in Pawn.capture_table.items()}
+RAYS = {direction: _ray_table(direction) for direction in ROOK_DIRECTIONS + BISHOP_DIRECTIONS}
+EDGE_ROWS = 0xFF | (0xFF << 56)
+EDGE_COLS = sum(bit(row, 0) | bit(row, 7) for row in range(8))
+
+
+def ray_attacks(direction, sq, blockers):
+    """Возвращает клетки луча из клетки sq до первого блокирующего бита включительно.
+
+    Args:
+        direction (tuple): Направление луча (dr, dc).
+        sq (int): Номер исходной клетки.
+        blockers (int): Битовая доска клеток, останавливающих луч.
+
+    Returns:
+        int: Битовая доска атакуемых клеток.
+    """
+    attacks = RAYS[direction][sq]
+    hit = attacks & blockers
+    if hit:
+        if direction in POSITIVE_DIRECTIONS:
+            first = (hit & -hit).bit_length() - 1
+        else:
+            first = hit.bit_length() - 1
+        attacks ^= RAYS[direction][first]
+    return attacks
+
+
+def slider_attacks(directions, sq, blockers):
+    """Объединяет лучевые атаки по нескольким направлениям."""
+    attacks = 0
+    for direction in directions:
+        attacks |= ray_attacks(direction, sq, blockers)
+    return attacks
+
+
+def cat_lines(sq):
+    """Возвращает направления, вдоль которых может двигаться кот с клетки sq."""
+    row, col = divmod(sq, 8)
+    directions = []
+    if row in [0, 7]:
+        directions.extend([EAST, WEST])
+    if col in [0, 7]:
+        directions.extend([NORTH, SOUTH])
+    return directions
+
+
+class BitboardBoard(Board):
+    """Доска, которая дополнительно хранит каждую пару цвет/тип фигуры как 64-битное число.
+
+    Ходы известных фигур и проверки атак считаются битовыми операциями.
+    Сетка grid поддерживается как и раньше, поэтому get_piece/place_piece
+    и фигуры новых типов работают без изменений.
+    """
+
+    def __init__(self):
+        """Инициализирует пустую доску и пустые битовые доски."""
+        super().__init__()
+        self.bitboards = {"white": {}, "black": {}}
+        self.occupancy = {"white": 0, "black": 0}
+
+    def _on_square_changed(self, row, col, old_piece, piece):
+        """Обновляет битовые доски после изменения клетки (карты атак не ведутся)."""
+        mask = bit(row, col)
+        if old_piece is not None:
+            self.bitboards[old_piece.color][type(old_piece)] &= ~mask
+            self.occupancy[old_piece.color] &= ~mask
+        if piece is not None:
+            boards = self.bitboards[piece.color]
+            boards[type(piece)] = boards.get(type(piece), 0) | mask
+            self.occupancy[piece.color] |= mask
+
+    def pieces_bb(self, color, piece_class):
+        """Возвращает битовую доску фигур заданного цвета и класса."""
+        return self.bitboards[color].get(piece_class, 0)
+
+    def is_square_attacked(self, color, pos):
+        """Проверяет, атакована ли клетка фигурами противника, с помощью битовых операций.
+
+        Args:
+            color (str): Цвет игрока, для которого проверяется угроза ("white" или "black").
+            pos (tuple): Позиция клетки в формате (row, col).
+
+        Returns:
+            bool: True, если клетка атакована, False — если нет.
+        """
+        opponent = "black" if color == "white" else "white"
+        sq = square(*pos)
+        occupied = self.occupancy["white"] | self.occupancy["black"]
+        boards = self.bitboards[opponent]
+        if KNIGHT_ATTACKS[sq] & boards.get(Knight, 0):
+            return True
+        if KING_ATTACKS[sq] & boards.get(King, 0):
+            return True
+        if RABBIT_ATTACKS[sq] & boards.get(Rabbit, 0):
+            return True
+        if PAWN_ATTACKS[color][sq] & boards.get(Pawn, 0):
+            return True
+        queens = boards.get(Queen, 0)
+        if slider_attacks(ROOK_DIRECTIONS, sq, occupied) & (boards.get(Rook, 0) | queens):
+            return True
+        if slider_attacks(BISHOP_DIRECTIONS, sq, occupied) & (boards.get(Bishop, 0) | queens):
+            return True
+        cats = boards.get(Cat, 0)
+        if cats:
+            for direction in cat_lines(sq):
+                if ray_attacks(direction, sq, self.occupancy[color]) & cats:
+                    return True
+        dogs = KING_ATTACKS[sq] & boards.get(Dog, 0)
+        for row, col in iter_squares(dogs):
+            if KING_ATTACKS[square(row, col)] & occupied:
+                return True
+        for piece_class in boards:
+            if piece_class not in BITBOARD_MOVES:
+                for piece in self.get_pieces(opponent, piece_class):
+                    if pos in piece.get_attacks(self):
+                        return True
+        return False
+
+    def get_piece_moves(self, piece):
+        """Возвращает допустимые ходы фигуры, вычисленные битовыми операциями.
+
+        Для классов фигур без битового генератора используется get_valid_moves.
+
+        Args:
+            piece (Piece): Фигура, для которой ищутся ходы.
+
+        Returns:
+            list: Список кортежей (row, col) — допустимые позиции для хода.
+        """
+        generator = BITBOARD_MOVES.get(type(piece))
+        if generator is None:
+            return piece.get_valid_moves(self)
+        return generator(self, piece)
+
+    def _targets(self, piece, bb):
+        return list(iter_squares(bb & ~self.occupancy[piece.color]))
+
+    def _pawn_moves(self, piece):
+        row, col = piece.position
+        sq = square(row, col)
+        occupied = self.occupancy["white"] | self.occupancy["black"]
+        opponent = "black" if piece.color == "white" else "white"
+        direction = 1 if piece.color == "white" else -1
+        moves = []
+        if 0 <= row + direction < 8 and not occupied & bit(row + direction, col):
+            moves.append((row + direction, col))
+            if (not piece.has_moved and 0 <= row + 2 * direction < 8 and
+                    not occupied & bit(row + 2 * direction, col)):
+                moves.append((row + 2 * direction, col))
+        moves.extend(iter_squares(PAWN_ATTACKS[piece.color][sq] & self.occupancy[opponent]))
+        moves.extend(piece._get_en_passant_moves(self))
+        return moves
+
+    def _slider_moves(self, piece, directions):
+        occupied = self.occupancy["white"] | self.occupancy["black"]
+        return self._targets(piece, slider_attacks(directions, square(*piece.position), occupied))
+
+    def _knight_moves(self, piece):
+        return self._targets(piece, KNIGHT_ATTACKS[square(*piece.position)])
+
+    def _rabbit_moves(self, piece):
+        return self._targets(piece, RABBIT_ATTACKS[square(*piece.position)])
+
+    def _dog_moves(self, piece):
+        sq = square(*piece.position)
+        if not KING_ATTACKS[sq] & (self.occupancy["white"] | self.occupancy["black"]):
+            return []
+        return self._targets(piece, KING_ATTACKS[sq])
+
+    def _cat_moves(self, piece):
+        sq = square(*piece.position)
+        opponent = "black" if piece.color == "white" else "white"
+        attacks = 0
+        for direction in cat_lines(sq):
+            attacks |= ray_attacks(direction, sq, self.occupancy[opponent])
+        return self._targets(piece, attacks)
+
+    def _king_moves(self, piece, check_castling=True):
+        row, col = piece.position
+        moves = []
+        for new_row, new_col in self._targets(piece, KING_ATTACKS[square(row, col)]):
+            original_piece = self.remove_piece(new_row, new_col)
+            self.remove_piece(row, col)
+            self.place_piece(piece, new_row, new_col)
+            in_check = self.is_in_check(piece.color)
+            self.remove_piece(new_row, new_col)
+            self.place_piece(piece, row, col)
+            if original_piece:
+                self.place_piece(original_piece, new_row, new_col)
+            if not in_check:
+                moves.append((new_row, new_col))
+        if check_castling:
+            moves.extend(piece._get_castling_moves(self))
+        return moves
+
+
+BITBOARD_MOVES = {
+    Pawn: BitboardBoard._pawn_moves,
+    Rook: lambda board, piece: board._slider_moves(piece, ROOK_DIRECTIONS),
+    Bishop: lambda board, piece: board._slider_moves(piece, BISHOP_DIRECTIONS),
+    Queen: lambda board, piece: board._slider_moves(piece, ROOK_DIRECTIONS + BISHOP_DIRECTIONS),
+    Knight: BitboardBoard._knight_moves,
+    King: BitboardBoard._king_moves,
+    Rabbit: BitboardBoard._rabbit_moves,
+    Dog: BitboardBoard._dog_moves,
+    Cat: BitboardBoard._cat_moves,
+}
+
+BACKENDS = {
+    "grid": Board,
+    "bitboard": BitboardBoard,
+}
+
+
+def create_board(backend="grid"):
+    """Создает доску с выбранным способом хранения позиции.
+
+    Args:
+        backend (str): "grid" — список списков фигур, "bitboard" — битовые доски.
+
+    Returns:
+        Board: Пустая доска выбранного типа.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Неизвестный тип доски: {backend}")
+    return BACKENDS[backend]()
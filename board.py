@@ -1,31 +1,120 @@
+import sys
+from collections import OrderedDict
+
+from render import render_plain
 from pieces import Piece, Pawn, Rook, Knight, Bishop, Queen, King, Rabbit, Dog, Cat
+from zobrist import piece_key, state_key
+
+REGULAR_PIECES = (Pawn, Rook, Knight, Bishop, Queen, King, Rabbit, Dog, Cat)
+POSITION_CACHE_SIZE = 256
+
+
+def parse_square(name):
+    """Преобразует шахматную нотацию клетки в координаты на доске.
+
+    Args:
+        name (str): Клетка в формате шахматной нотации (например, "E2").
+
+    Returns:
+        tuple: Кортеж (row, col) с координатами (например, (1, 4)).
+    """
+    if len(name) != 2 or not name[1].isdigit():
+        raise ValueError(f"Неверная клетка: {name}")
+    col = ord(name[0].upper()) - ord('A')
+    row = int(name[1]) - 1
+    if not (0 <= row < 8 and 0 <= col < 8):
+        raise ValueError(f"Неверная клетка: {name}")
+    return (row, col)
+
+
+def square_name(coords):
+    """Преобразует координаты на доске в шахматную нотацию клетки.
+
+    Args:
+        coords (tuple): Кортеж (row, col).
+
+    Returns:
+        str: Клетка в формате шахматной нотации (например, "E2").
+    """
+    row, col = coords
+    return f"{chr(ord('A') + col)}{row + 1}"
+
 
 class Move:
     """
     Класс, представляющий один ход в шахматной игре.
 
+    Кроме начальной и конечной клетки хранит всё, что нужно для точной отмены:
+    взятую фигуру и её клетку (при взятии на проходе она не совпадает с to_pos),
+    фигуру превращения, перемещение ладьи при рокировке и признак первого хода.
+
     Args:
         piece (Piece): Фигура, которая совершает ход.
         from_pos (tuple): Начальная позиция в формате (row, col).
         to_pos (tuple): Конечная позиция в формате (row, col).
     """
 
+    __slots__ = ("piece", "from_pos", "to_pos", "captured", "captured_pos",
+                 "promoted_to", "rook_from", "rook_to", "first_move")
+
     def __init__(self, piece, from_pos, to_pos):
         self.piece = piece
         self.from_pos = from_pos
         self.to_pos = to_pos
         self.captured = None
+        self.captured_pos = None
         self.promoted_to = None
+        self.rook_from = None
+        self.rook_to = None
+        self.first_move = False
+
+    def __str__(self):
+        """Возвращает ход в формате консоли (например, "E2 E4")."""
+        return f"{square_name(self.from_pos)} {square_name(self.to_pos)}"
+
+class PositionInfo:
+    """Сведения о позиции для игрока, который ходит, вычисленные один раз.
+
+    Хранятся только клетки, а не объекты Move, поэтому сведения можно безопасно
+    использовать при каждом возвращении в ту же позицию.
+
+    Args:
+        board (Board): Доска в позиции, для которой собираются сведения.
+    """
+
+    __slots__ = ("moves", "check", "checkers", "threatened", "checkmate", "stalemate")
+
+    def __init__(self, board):
+        color = board.turn
+        self.moves = {}
+        for move in board.generate_legal_moves(color):
+            self.moves.setdefault(move.from_pos, []).append(move.to_pos)
+        self.check = board.is_in_check(color)
+        self.checkers = board.find_checkers(color) if self.check else []
+        self.threatened = board._find_threatened(color)
+        self.checkmate = self.check and not self.moves
+        self.stalemate = not self.check and not self.moves
+
 
 class Board:
     """Класс, представляющий шахматную доску и управляющий её состоянием."""
 
     def __init__(self):
-        """Инициализирует пустую доску, историю ходов и счетчик ходов."""
+        """Инициализирует пустую доску, историю ходов, счетчик ходов и очередь хода."""
         self.grid = [[None for _ in range(8)] for _ in range(8)]
         self.move_history = []
         self.move_count = 0
-        
+        self.turn = "white"
+        self.en_passant_target = None
+        self._piece_hash = 0
+        self.attack_map = {color: [[0] * 8 for _ in range(8)] for color in ("white", "black")}
+        self._piece_attacks = {}
+        self._piece_watch = {}
+        self._watchers = [[set() for _ in range(8)] for _ in range(8)]
+        self._global_watchers = set()
+        self.piece_index = {"white": {}, "black": {}}
+        self._position_cache = OrderedDict()
+
     def setup_initial_position(self, version):
         """Расставляет фигуры на доске в начальной позиции.
 
@@ -70,6 +159,24 @@ class Board:
             self.place_piece(Rabbit("black"), 7, 6)
             self.place_piece(Cat("black"), 7, 7)
             
+    def clear(self):
+        """Убирает все фигуры и сбрасывает историю ходов, счетчик и очередь хода.
+
+        Returns:
+            list: Фигуры, которые стояли на доске (их можно использовать повторно).
+        """
+        removed = []
+        for row in range(8):
+            for col in range(8):
+                piece = self.remove_piece(row, col)
+                if piece is not None:
+                    removed.append(piece)
+        self.move_history = []
+        self.move_count = 0
+        self.turn = "white"
+        self.en_passant_target = None
+        return removed
+
     def place_piece(self, piece, row, col):
         """Размещает фигуру на указанной клетке доски.
 
@@ -78,8 +185,105 @@ class Board:
             row (int): Номер строки (0-7).
             col (int): Номер столбца (0-7).
         """
+        self._set_square(row, col, piece)
+
+    def remove_piece(self, row, col):
+        """Убирает фигуру с указанной клетки доски.
+
+        Args:
+            row (int): Номер строки (0-7).
+            col (int): Номер столбца (0-7).
+
+        Returns:
+            Piece or None: Убранная фигура или None, если клетка была пуста.
+        """
+        piece = self.grid[row][col]
+        if piece is not None:
+            self._set_square(row, col, None)
+        return piece
+
+    def _set_square(self, row, col, piece):
+        """Записывает фигуру (или None) в клетку и обновляет индекс фигур и ключ позиции."""
+        old_piece = self.grid[row][col]
+        if old_piece is not None:
+            del self.piece_index[old_piece.color][type(old_piece)][old_piece]
+            self._piece_hash ^= piece_key(old_piece, row, col)
         self.grid[row][col] = piece
-        piece.position = (row, col)
+        if piece is not None:
+            piece.position = (row, col)
+            self.piece_index[piece.color].setdefault(type(piece), {})[piece] = None
+            self._piece_hash ^= piece_key(piece, row, col)
+        self._on_square_changed(row, col, old_piece, piece)
+
+    def _on_square_changed(self, row, col, old_piece, piece):
+        """Обновляет карты атак после изменения клетки.
+
+        Пересчитываются атаки только тех фигур, которые зависят от этой клетки,
+        и самой поставленной фигуры.
+        """
+        if old_piece is not None:
+            self._detach_attacks(old_piece)
+        affected = list(self._watchers[row][col])
+        affected.extend(self._global_watchers)
+        if piece is not None:
+            affected.append(piece)
+        for other in affected:
+            self._update_attacks(other)
+
+    @property
+    def hash(self):
+        """64-битный ключ Зобриста текущей позиции.
+
+        Расстановка фигур учитывается инкрементально при каждом изменении клетки;
+        очередь хода, права на рокировку (по has_moved) и вертикаль взятия на проходе
+        (get_en_passant_target) добавляются за O(1).
+        """
+        return self._piece_hash ^ state_key(self)
+
+    def get_en_passant_target(self):
+        """Возвращает клетку, на которую возможно взятие на проходе.
+
+        Клетку дает последний ход, если это двойной ход пешки. Пока ходов нет,
+        действует en_passant_target, заданный при расстановке позиции
+        (fen.set_en_passant): он не записывается в историю и не отменяется.
+
+        Returns:
+            tuple or None: Клетка (row, col), через которую прошла пешка, или None.
+        """
+        if not self.move_history:
+            return self.en_passant_target
+        last_move = self.move_history[-1]
+        if isinstance(last_move.piece, Pawn) and abs(last_move.from_pos[0] - last_move.to_pos[0]) == 2:
+            return ((last_move.from_pos[0] + last_move.to_pos[0]) // 2, last_move.to_pos[1])
+        return None
+
+    def _detach_attacks(self, piece):
+        """Убирает атаки фигуры из карты атак и снимает её с наблюдения за клетками."""
+        counts = self.attack_map[piece.color]
+        for row, col in self._piece_attacks.pop(piece, ()):
+            counts[row][col] -= 1
+        watch = self._piece_watch.pop(piece, ())
+        if watch is None:
+            self._global_watchers.discard(piece)
+        else:
+            for row, col in watch:
+                self._watchers[row][col].discard(piece)
+
+    def _update_attacks(self, piece):
+        """Пересчитывает атаки фигуры и заносит их в карту атак её цвета."""
+        self._detach_attacks(piece)
+        attacks = piece.get_attacks(self)
+        watch = piece.get_attack_watch(self, attacks)
+        counts = self.attack_map[piece.color]
+        for row, col in attacks:
+            counts[row][col] += 1
+        self._piece_attacks[piece] = attacks
+        self._piece_watch[piece] = watch
+        if watch is None:
+            self._global_watchers.add(piece)
+        else:
+            for row, col in watch:
+                self._watchers[row][col].add(piece)
         
     def is_empty(self, row, col):
         """Проверяет, пуста ли указанная клетка.
@@ -105,6 +309,32 @@ class Board:
         """
         return self.grid[row][col]
 
+    def get_pieces(self, color, piece_class=None):
+        """Возвращает фигуры заданного цвета, стоящие на доске.
+
+        Args:
+            color (str): Цвет фигур ("white" или "black").
+            piece_class (type, optional): Класс фигур; если не задан, возвращаются все фигуры цвета.
+
+        Returns:
+            list: Список фигур в порядке их появления на доске.
+        """
+        index = self.piece_index[color]
+        if piece_class is not None:
+            return list(index.get(piece_class, ()))
+        return [piece for pieces in index.values() for piece in pieces]
+
+    def get_piece_moves(self, piece):
+        """Возвращает допустимые ходы фигуры, стоящей на этой доске.
+
+        Args:
+            piece (Piece): Фигура, для которой ищутся ходы.
+
+        Returns:
+            list: Список кортежей (row, col) — допустимые позиции для хода.
+        """
+        return piece.get_valid_moves(self)
+
     def _find_king(self, color):
         """Находит позицию короля заданного цвета.
 
@@ -114,11 +344,8 @@ class Board:
         Returns:
             tuple or None: Кортеж (row, col) с позицией короля или None, если король не найден.
         """
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece(row, col)
-                if piece and isinstance(piece, King) and piece.color == color:
-                    return (row, col)
+        for king in self.piece_index[color].get(King, ()):
+            return king.position
         return None
 
     def is_in_check(self, color):
@@ -133,15 +360,7 @@ class Board:
         king_pos = self._find_king(color)
         if not king_pos:
             return False
-        opponent_color = "black" if color == "white" else "white"
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece(row, col)
-                if piece and piece.color == opponent_color:
-                    moves = piece.get_valid_moves(self, check_castling=False) if isinstance(piece, King) else piece.get_valid_moves(self)
-                    if king_pos in moves:
-                        return True
-        return False
+        return self.is_square_attacked(color, king_pos)
 
     def is_square_attacked(self, color, pos):
         """Проверяет, атакована ли указанная клетка фигурами противника.
@@ -154,13 +373,57 @@ class Board:
             bool: True, если клетка атакована, False — если нет.
         """
         opponent_color = "black" if color == "white" else "white"
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece(row, col)
-                if piece and piece.color == opponent_color:
-                    if pos in piece.get_valid_moves(self):
-                        return True
-        return False
+        return self.attack_map[opponent_color][pos[0]][pos[1]] > 0
+
+    def position_info(self):
+        """Возвращает сведения о текущей позиции для игрока, который ходит.
+
+        Сведения кэшируются по ключу позиции (Board.hash) для последних
+        POSITION_CACHE_SIZE позиций, поэтому после хода или отмены кэш не нужно
+        сбрасывать, а при возврате в позицию сведения берутся без пересчета.
+
+        Returns:
+            PositionInfo: Легальные ходы, шах, шахующие фигуры, угрозы, мат и пат.
+        """
+        key = self.hash
+        info = self._position_cache.get(key)
+        if info is None:
+            info = PositionInfo(self)
+            self.publish_position_info(key, info)
+        else:
+            self._position_cache.move_to_end(key)
+        return info
+
+    def has_position_info(self, key):
+        """Проверяет, есть ли в кэше сведения о позиции с ключом key."""
+        return key in self._position_cache
+
+    def publish_position_info(self, key, info):
+        """Добавляет в кэш сведения о позиции, вычисленные заранее (например, на копии доски).
+
+        Args:
+            key (int): Ключ позиции (Board.hash той доски, на которой считались сведения).
+            info (PositionInfo): Сведения о позиции.
+        """
+        cache = self._position_cache
+        cache[key] = info
+        if len(cache) > POSITION_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def find_checkers(self, color):
+        """Возвращает клетки фигур соперника, которые шахуют короля заданного цвета.
+
+        Args:
+            color (str): Цвет короля ("white" или "black").
+
+        Returns:
+            list: Список кортежей (row, col).
+        """
+        king_pos = self._find_king(color)
+        if not king_pos or not self.is_square_attacked(color, king_pos):
+            return []
+        opponent_color = "black" if color == "white" else "white"
+        return [piece.position for piece in self.get_pieces(opponent_color) if king_pos in piece.get_attacks(self)]
 
     def is_checkmate(self, color):
         """Проверяет, является ли позиция матовой для игрока заданного цвета.
@@ -171,82 +434,205 @@ class Board:
         Returns:
             bool: True, если мат, False — если есть ход для избежания шаха.
         """
+        if color == self.turn:
+            return self.position_info().checkmate
         if not self.is_in_check(color):
             return False
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece(row, col)
-                if piece and piece.color == color:
-                    moves = piece.get_valid_moves(self)
-                    for move in moves:
-                        captured = self.get_piece(*move)
-                        self.grid[move[0]][move[1]] = piece
-                        self.grid[row][col] = None
-                        old_pos = piece.position
-                        piece.position = move
-                        was_moved = piece.has_moved if hasattr(piece, 'has_moved') else None
-                        if hasattr(piece, 'has_moved'):
-                            piece.has_moved = True
-                        still_in_check = self.is_in_check(color)
-                        self.grid[row][col] = piece
-                        self.grid[move[0]][move[1]] = captured
-                        piece.position = old_pos
-                        if was_moved is not None:
-                            piece.has_moved = was_moved
-                        if not still_in_check:
-                            return False
-        return True
-        
-    def move_piece(self, from_pos, to_pos):
-        """Выполняет ход фигуры с одной позиции на другую.
+        return not self.generate_legal_moves(color)
+
+    def generate_legal_moves(self, color):
+        """Возвращает все легальные ходы игрока заданного цвета.
+
+        Связанные фигуры и шахующие фигуры находятся один раз на позицию.
+        Через make_move/unmake_move проверяются только ходы связанных фигур,
+        взятие на проходе и ходы под шахом (при нескольких шахующих фигурах —
+        все ходы: кот бьет сквозь свою фигуру, и один ход может закрыть оба
+        шаха); ходы короля уже проверены в King.get_valid_moves.
+
+        Args:
+            color (str): Цвет игрока ("white" или "black").
+
+        Returns:
+            list: Список объектов Move.
+        """
+        return self._generate_legal_moves(color, self.get_pieces(color))
+
+    def get_legal_moves(self, piece):
+        """Возвращает легальные ходы одной фигуры (не оставляющие своего короля под шахом).
+
+        Args:
+            piece (Piece): Фигура, для которой ищутся ходы.
+
+        Returns:
+            list: Список кортежей (row, col) — допустимые позиции для хода.
+        """
+        if piece.color == self.turn and piece.position and self.get_piece(*piece.position) is piece:
+            return list(self.position_info().moves.get(piece.position, ()))
+        return [move.to_pos for move in self._generate_legal_moves(piece.color, [piece])]
+
+    def _generate_legal_moves(self, color, pieces):
+        king_pos = self._find_king(color)
+        opponent_color = "black" if color == "white" else "white"
+        checkers = []
+        if king_pos and self.is_square_attacked(color, king_pos):
+            checkers = [piece for piece in self.get_pieces(opponent_color) if king_pos in piece.get_attacks(self)]
+        if king_pos is None:
+            pinned = set()
+        elif self._has_irregular_attackers(opponent_color):
+            pinned = set(self.get_pieces(color))
+        else:
+            pinned = self._find_pinned(color, king_pos)
+        evasions = None
+        if len(checkers) == 1:
+            evasions = {checkers[0].position}
+            evasions.update(self._squares_between(checkers[0], king_pos))
+        legal_moves = []
+        for piece in pieces:
+            from_pos = piece.position
+            is_king = isinstance(piece, King)
+            for to_pos in self.get_piece_moves(piece):
+                move = self.create_move(from_pos, to_pos)
+                if is_king:
+                    legal_moves.append(move)
+                    continue
+                if evasions is not None and to_pos not in evasions and move.captured_pos not in evasions:
+                    continue
+                if checkers or piece in pinned or move.captured_pos not in (None, to_pos):
+                    if self._leaves_king_in_check(move):
+                        continue
+                legal_moves.append(move)
+        return legal_moves
+
+    def _has_irregular_attackers(self, color):
+        """Проверяет, есть ли у игрока фигуры, чьи атаки не описываются таблицами лучей и прыжков."""
+        for piece_class in self.piece_index[color]:
+            if piece_class not in REGULAR_PIECES and piece_class.get_valid_moves is not Piece.get_valid_moves:
+                return True
+        return False
+
+    def _squares_between(self, attacker, target):
+        """Возвращает клетки луча фигуры attacker строго между ней и клеткой target."""
+        for ray in attacker.ray_table[attacker.position]:
+            if target in ray:
+                return ray[:ray.index(target)]
+        return ()
+
+    def _find_pinned(self, color, king_pos):
+        """Находит фигуры, которые могут быть связаны с королем заданного цвета.
+
+        Фигура считается связанной, если она единственная своя фигура между королем
+        и лучевой фигурой соперника на одном луче. Чужие фигуры на луче не учитываются,
+        поэтому набор может быть шире настоящего, но ничего не пропускает.
+        """
+        opponent_color = "black" if color == "white" else "white"
+        pinned = set()
+        for attacker in self.get_pieces(opponent_color):
+            between = self._squares_between(attacker, king_pos)
+            own = [self.grid[row][col] for row, col in between
+                   if self.grid[row][col] is not None and self.grid[row][col].color == color]
+            if len(own) == 1:
+                pinned.add(own[0])
+        return pinned
+
+    def _leaves_king_in_check(self, move):
+        """Проверяет ход через make_move/unmake_move: остается ли свой король под шахом."""
+        color = move.piece.color
+        self.make_move(move)
+        in_check = self.is_in_check(color)
+        self.unmake_move()
+        return in_check
+
+    def create_move(self, from_pos, to_pos):
+        """Создает объект хода со всеми последствиями: взятие, рокировка, превращение.
+
+        Ход не выполняется и не проверяется на допустимость.
 
         Args:
             from_pos (tuple): Начальная позиция в формате (row, col).
             to_pos (tuple): Конечная позиция в формате (row, col).
 
         Returns:
-            bool: True, если ход успешен, False — если ход недопустим.
+            Move: Объект хода.
         """
         piece = self.get_piece(*from_pos)
-        if not piece:
-            return False
-        valid_moves = piece.get_valid_moves(self)
-        if to_pos not in valid_moves:
-            return False
         move = Move(piece, from_pos, to_pos)
         move.captured = self.get_piece(*to_pos)
+        if move.captured:
+            move.captured_pos = to_pos
+        if isinstance(piece, Pawn):
+            if move.captured is None and from_pos[1] != to_pos[1]:
+                move.captured = self.get_piece(from_pos[0], to_pos[1])
+                move.captured_pos = (from_pos[0], to_pos[1])
+            if (piece.color == "white" and to_pos[0] == 7) or (piece.color == "black" and to_pos[0] == 0):
+                move.promoted_to = Queen(piece.color)
         if isinstance(piece, King) and abs(to_pos[1] - from_pos[1]) == 2:
             if to_pos[1] == 6:
-                rook = self.get_piece(from_pos[0], 7)
-                self.grid[from_pos[0]][5] = rook
-                self.grid[from_pos[0]][7] = None
-                rook.position = (from_pos[0], 5)
-                rook.has_moved = True
+                move.rook_from, move.rook_to = (from_pos[0], 7), (from_pos[0], 5)
             elif to_pos[1] == 2:
-                rook = self.get_piece(from_pos[0], 0)
-                self.grid[from_pos[0]][3] = rook
-                self.grid[from_pos[0]][0] = None
-                rook.position = (from_pos[0], 3)
-                rook.has_moved = True
-        if isinstance(piece, Pawn):
-            if (piece.color == "white" and to_pos[0] == 7) or (piece.color == "black" and to_pos[0] == 0):
-                new_piece = Queen(piece.color)
-                move.promoted_to = new_piece
-                self.grid[to_pos[0]][to_pos[1]] = new_piece
-                new_piece.position = to_pos
-            else:
-                self.grid[to_pos[0]][to_pos[1]] = piece
-                piece.position = to_pos
-        else:
-            self.grid[to_pos[0]][to_pos[1]] = piece
-            piece.position = to_pos
-        self.grid[from_pos[0]][from_pos[1]] = None
+                move.rook_from, move.rook_to = (from_pos[0], 0), (from_pos[0], 3)
+        return move
+
+    def make_move(self, move):
+        """Выполняет ход без проверки допустимости и записывает его в историю.
+
+        Args:
+            move (Move): Ход, созданный create_move.
+        """
+        piece = move.piece
+        move.first_move = getattr(piece, 'has_moved', True) is False
+        if move.captured:
+            self.remove_piece(*move.captured_pos)
+        if move.rook_from:
+            rook = self.remove_piece(*move.rook_from)
+            self.place_piece(rook, *move.rook_to)
+            rook.has_moved = True
+        self.remove_piece(*move.from_pos)
+        self.place_piece(move.promoted_to or piece, *move.to_pos)
         if hasattr(piece, 'has_moved'):
             piece.has_moved = True
         self.move_history.append(move)
         self.move_count += 1
+        self.turn = "black" if self.turn == "white" else "white"
+
+    def unmake_move(self):
+        """Отменяет последний ход из истории, точно восстанавливая позицию.
+
+        Returns:
+            Move: Отмененный ход.
+        """
+        move = self.move_history.pop()
+        self.remove_piece(*move.to_pos)
+        self.place_piece(move.piece, *move.from_pos)
+        if move.rook_from:
+            rook = self.remove_piece(*move.rook_to)
+            self.place_piece(rook, *move.rook_from)
+            rook.has_moved = False
+        if move.captured:
+            self.place_piece(move.captured, *move.captured_pos)
+        if move.first_move:
+            move.piece.has_moved = False
+        self.move_count -= 1
+        self.turn = "black" if self.turn == "white" else "white"
+        return move
+
+    def move_piece(self, from_pos, to_pos):
+        """Выполняет ход фигуры с одной позиции на другую.
+
+        Args:
+            from_pos (tuple): Начальная позиция в формате (row, col).
+            to_pos (tuple): Конечная позиция в формате (row, col).
+
+        Returns:
+            bool: True, если ход успешен, False — если ход недопустим.
+        """
+        piece = self.get_piece(*from_pos)
+        if not piece:
+            return False
+        if to_pos not in self.get_legal_moves(piece):
+            return False
+        self.make_move(self.create_move(from_pos, to_pos))
         return True
-        
+
     def undo_last_move(self):
         """Отменяет последний сделанный ход.
 
@@ -255,52 +641,25 @@ class Board:
         """
         if not self.move_history:
             return False
-        last_move = self.move_history.pop()
-        self.grid[last_move.from_pos[0]][last_move.from_pos[1]] = last_move.piece
-        self.grid[last_move.to_pos[0]][last_move.to_pos[1]] = last_move.captured
-        last_move.piece.position = last_move.from_pos
-        if isinstance(last_move.piece, King) and abs(last_move.to_pos[1] - last_move.from_pos[1]) == 2:
-            if last_move.to_pos[1] == 6:
-                rook = self.get_piece(last_move.from_pos[0], 5)
-                self.grid[last_move.from_pos[0]][7] = rook
-                self.grid[last_move.from_pos[0]][5] = None
-                rook.position = (last_move.from_pos[0], 7)
-                rook.has_moved = False
-            elif last_move.to_pos[1] == 2:
-                rook = self.get_piece(last_move.from_pos[0], 3)
-                self.grid[last_move.from_pos[0]][0] = rook
-                self.grid[last_move.from_pos[0]][3] = None
-                rook.position = (last_move.from_pos[0], 0)
-                rook.has_moved = False
-        if last_move.promoted_to:
-            self.grid[last_move.to_pos[0]][last_move.to_pos[1]] = last_move.captured
-        if hasattr(last_move.piece, 'has_moved') and last_move.from_pos[0] == (1 if last_move.piece.color == "white" else 6):
-            last_move.piece.has_moved = False
-        self.move_count -= 1
+        self.unmake_move()
         return True
-        
-    def display(self, highlight_moves=None, threatened=None):
+
+    def display(self, highlight_moves=None, threatened=None, renderer=None):
         """Отображает текущее состояние доски в консоли с подсветкой ходов или угроз.
 
+        По умолчанию кадр выводится целиком одной записью в sys.stdout; с renderer
+        (render.TerminalRenderer) перерисовываются только изменившиеся клетки.
+
         Args:
             highlight_moves (list, optional): Список позиций (row, col) для подсветки допустимых ходов.
             threatened (list, optional): Список позиций (row, col) для подсветки угрожаемых фигур.
+            renderer (TerminalRenderer, optional): Отрисовщик для терминалов ANSI.
         """
-        print("\n   A  B  C  D  E  F  G  H")
-        for row in range(7, -1, -1):
-            line = [f"{row+1} "]
-            for col in range(8):
-                piece = self.grid[row][col]
-                cell = str(piece or '.')
-                if highlight_moves and (row, col) in highlight_moves:
-                    cell = f"[{cell}]"
-                elif threatened and (row, col) in threatened:
-                    cell = f"*{cell}*"
-                line.append(cell.center(3))
-            line.append(f" {row+1}")
-            print(''.join(line))
-        print("   A  B  C  D  E  F  G  H")
-        print(f"\nХодов сделано: {self.move_count}")
+        if renderer is not None:
+            renderer.draw(self, highlight_moves, threatened)
+            return
+        sys.stdout.write(render_plain(self, highlight_moves, threatened))
+        sys.stdout.flush()
 
     def get_threatened_pieces(self, color):
         """Возвращает список позиций фигур заданного цвета, находящихся под угрозой.
@@ -311,15 +670,17 @@ class Board:
         Returns:
             list: Список кортежей (row, col) с позициями угрожаемых фигур.
         """
+        if color == self.turn:
+            return list(self.position_info().threatened)
+        return self._find_threatened(color)
+
+    def _find_threatened(self, color):
         threatened = []
         opponent_color = "black" if color == "white" else "white"
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece(row, col)
-                if piece and piece.color == opponent_color:
-                    moves = piece.get_valid_moves(self)
-                    for move in moves:
-                        target = self.get_piece(*move)
-                        if target and target.color == color:
-                            threatened.append(move)
+        for piece in self.get_pieces(opponent_color):
+            moves = self.get_piece_moves(piece)
+            for move in moves:
+                target = self.get_piece(*move)
+                if target and target.color == color:
+                    threatened.append(move)
         return threatened
\ No newline at end of file
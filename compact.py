@@ -0,0 +1,156 @@
+from bitboard import create_board
+from board import REGULAR_PIECES
+from fen import set_castling_rights, set_en_passant
+from zobrist import castling_rights, en_passant_file
+
+PIECE_CODES = {piece_class: code for code, piece_class in enumerate(REGULAR_PIECES, 1)}
+PIECE_CLASSES = (None,) + REGULAR_PIECES
+STATE_SIZE = 3
+SIZE = 64 + STATE_SIZE
+
+
+def piece_code(piece):
+    """Возвращает байтовый код фигуры: k для белых и 256 - k для черных.
+
+    При чтении байтов как знаковых (int8) белые фигуры дают k, черные — -k.
+
+    Args:
+        piece (Piece): Фигура одного из классов REGULAR_PIECES.
+
+    Returns:
+        int: Код фигуры от 1 до 255.
+
+    Raises:
+        ValueError: Если класс фигуры не входит в REGULAR_PIECES.
+    """
+    code = PIECE_CODES.get(type(piece))
+    if code is None:
+        raise ValueError(f"Фигура {type(piece).__name__} не поддерживается компактным представлением")
+    return code if piece.color == "white" else 256 - code
+
+
+def decode_piece(code):
+    """Возвращает (класс фигуры, цвет) по байтовому коду или None для пустой клетки."""
+    if code == 0:
+        return None
+    if code < 128:
+        return PIECE_CLASSES[code], "white"
+    return PIECE_CLASSES[256 - code], "black"
+
+
+class CompactPosition:
+    """Позиция в 64-байтовом массиве кодов фигур без объектов на клетках.
+
+    Кроме клеток хранит очередь хода, права на рокировку и вертикаль взятия на
+    проходе — всё, что нужно для восстановления доски через to_board. Методы
+    get_piece, place_piece, remove_piece и is_empty повторяют интерфейс Board;
+    get_piece создает новый объект фигуры при каждом вызове.
+
+    Args:
+        squares (bytearray, optional): 64 кода фигур, индекс — row * 8 + col.
+    """
+
+    __slots__ = ("squares", "turn", "castling", "ep_file")
+
+    def __init__(self, squares=None):
+        self.squares = bytearray(64) if squares is None else bytearray(squares)
+        self.turn = "white"
+        self.castling = 0
+        self.ep_file = None
+
+    @classmethod
+    def from_board(cls, board):
+        """Создает компактную копию позиции доски.
+
+        Args:
+            board (Board): Доска.
+
+        Returns:
+            CompactPosition: Копия позиции.
+        """
+        position = cls()
+        squares = position.squares
+        for color in ("white", "black"):
+            for pieces in board.piece_index[color].values():
+                for piece in pieces:
+                    row, col = piece.position
+                    squares[row * 8 + col] = piece_code(piece)
+        position.turn = board.turn
+        position.castling = castling_rights(board)
+        position.ep_file = en_passant_file(board)
+        return position
+
+    def to_board(self, board=None, backend="grid"):
+        """Расставляет позицию на доске.
+
+        Args:
+            board (Board, optional): Доска для повторного использования.
+            backend (str): Тип доски, если board не задана.
+
+        Returns:
+            Board: Доска с восстановленной позицией.
+        """
+        if board is None:
+            board = create_board(backend)
+        board.clear()
+        for index, code in enumerate(self.squares):
+            if code:
+                piece_class, color = decode_piece(code)
+                board.place_piece(piece_class(color), index // 8, index % 8)
+        set_castling_rights(board, self.castling)
+        board.turn = self.turn
+        if self.ep_file is not None:
+            set_en_passant(board, (5 if self.turn == "white" else 2, self.ep_file))
+        return board
+
+    def to_bytes(self):
+        """Упаковывает позицию в SIZE байт: 64 клетки, очередь хода, рокировки, вертикаль взятия на проходе."""
+        return bytes(self.squares) + bytes((self.turn == "black", self.castling,
+                                            8 if self.ep_file is None else self.ep_file))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Восстанавливает позицию, упакованную to_bytes."""
+        if len(data) != SIZE:
+            raise ValueError(f"Ожидалось {SIZE} байт, получено {len(data)}")
+        position = cls(data[:64])
+        position.turn = "black" if data[64] else "white"
+        position.castling = data[65]
+        position.ep_file = None if data[66] == 8 else data[66]
+        return position
+
+    def copy(self):
+        """Возвращает независимую копию позиции."""
+        return CompactPosition.from_bytes(self.to_bytes())
+
+    def is_empty(self, row, col):
+        """Проверяет, пуста ли клетка (row, col)."""
+        return self.squares[row * 8 + col] == 0
+
+    def get_piece(self, row, col):
+        """Возвращает новую фигуру, соответствующую коду на клетке, или None."""
+        decoded = decode_piece(self.squares[row * 8 + col])
+        if decoded is None:
+            return None
+        piece = decoded[0](decoded[1])
+        piece.position = (row, col)
+        return piece
+
+    def place_piece(self, piece, row, col):
+        """Записывает код фигуры в клетку (row, col)."""
+        self.squares[row * 8 + col] = piece_code(piece)
+        piece.position = (row, col)
+
+    def remove_piece(self, row, col):
+        """Очищает клетку и возвращает стоявшую на ней фигуру (или None)."""
+        piece = self.get_piece(row, col)
+        self.squares[row * 8 + col] = 0
+        return piece
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactPosition):
+            return NotImplemented
+        return self.to_bytes() == other.to_bytes()
+
+    def __hash__(self):
+        return hash(self.to_bytes())
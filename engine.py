@@ -0,0 +1,446 @@
+import argparse
+import time
+
+from bitboard import create_board, BACKENDS
+from fen import load_fen
+from pieces import Pawn, Rook, Knight, Bishop, Queen, King, Rabbit, Dog, Cat
+from tablebase import Tablebases, WIN, LOSS
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+PIECE_VALUES = {
+    Pawn: 100,
+    Knight: 320,
+    Bishop: 330,
+    Rook: 500,
+    Queen: 900,
+    King: 0,
+    Rabbit: 280,
+    Dog: 250,
+    Cat: 300,
+}
+DEFAULT_VALUE = 300
+MATE_SCORE = 100000
+MATE_BOUND = MATE_SCORE - 1000
+INFINITY = MATE_SCORE + 1
+MAX_PLY = 128
+CHECK_INTERVAL = 1024
+
+
+def piece_value(piece):
+    """Возвращает материальную ценность фигуры в сотых долях пешки."""
+    return PIECE_VALUES.get(type(piece), DEFAULT_VALUE)
+
+
+def _score_to_table(score, ply):
+    # Оценка мата в таблице считается от текущей позиции, а не от корня.
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _score_from_table(score, ply):
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def _tablebase_score(outcome, ply):
+    # Результат таблицы эндшпиля (исход, полуходов до мата) в оценку поиска на глубине ply.
+    result, plies = outcome
+    if result == WIN:
+        return MATE_SCORE - ply - plies
+    if result == LOSS:
+        return -MATE_SCORE + ply + plies
+    return 0
+
+
+def evaluate(board):
+    """Оценивает позицию с точки зрения игрока, который ходит.
+
+    Учитывается материал, продвижение пешек и близость легких фигур к центру.
+
+    Args:
+        board (Board): Доска.
+
+    Returns:
+        int: Оценка в сотых долях пешки (больше — лучше для ходящего).
+    """
+    score = 0
+    for color, sign in (("white", 1), ("black", -1)):
+        for piece_class, pieces in board.piece_index[color].items():
+            value = PIECE_VALUES.get(piece_class, DEFAULT_VALUE)
+            for piece in pieces:
+                row, col = piece.position
+                if piece_class is Pawn:
+                    advance = row - 1 if color == "white" else 6 - row
+                    value_here = value + 5 * advance + (10 if advance and col in (3, 4) else 0)
+                elif piece_class is King:
+                    value_here = 0
+                else:
+                    value_here = value + (10 if 2 <= row <= 5 and 2 <= col <= 5 else 0)
+                score += sign * value_here
+    return score if board.turn == "white" else -score
+
+
+class SearchResult:
+    """Результат поиска лучшего хода.
+
+    Args:
+        move (Move, optional): Лучший найденный ход; None, если ходов нет.
+        score (int): Оценка для ходящего игрока в сотых долях пешки.
+        depth (int): Последняя полностью просчитанная глубина.
+        nodes (int): Число просмотренных позиций.
+        elapsed (float): Время поиска в секундах.
+        cutoffs (int): Число отсечений по бете.
+        first_move_cutoffs (int): Сколько из них дал первый же ход (мера качества сортировки).
+        pv (list, optional): Главный вариант в формате "E2 E4", восстановленный по таблице позиций.
+    """
+
+    def __init__(self, move, score, depth, nodes, elapsed, cutoffs=0, first_move_cutoffs=0, pv=None):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.cutoffs = cutoffs
+        self.first_move_cutoffs = first_move_cutoffs
+        self.pv = pv or []
+
+    @property
+    def nps(self):
+        """Скорость поиска в позициях в секунду."""
+        return self.nodes / self.elapsed if self.elapsed else 0
+
+    @property
+    def mate_in(self):
+        """Число ходов до мата (отрицательное — мат ходящему) или None."""
+        if abs(self.score) < MATE_BOUND:
+            return None
+        plies = MATE_SCORE - abs(self.score)
+        return (plies + 1) // 2 if self.score > 0 else -(plies // 2)
+
+
+class Engine:
+    """Поиск лучшего хода: negamax с альфа-бета отсечением и итеративным углублением.
+
+    На листьях выполняется форсированный поиск взятий (quiescence). Ходы
+    сортируются так: ход из таблицы позиций, взятия по MVV-LVA, ходы-убийцы,
+    затем по таблице истории.
+
+    Args:
+        board (Board): Доска; после поиска позиция остается прежней.
+        tt (TranspositionTable, optional): Таблица позиций; её можно передавать
+            между поисками, чтобы повторный анализ использовал прежние результаты.
+        tablebases (Tablebases, optional): Таблицы эндшпиля. В покрытой позиции в
+            корне ход выбирается по таблицам без поиска, внутри дерева позиция
+            сразу получает точную оценку.
+    """
+
+    def __init__(self, board, tt=None, tablebases=None):
+        self.board = board
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.tablebases = tablebases
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = {}
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.deadline = None
+        self.stopped = False
+
+    def search(self, max_depth=64, time_limit=None, report=None, moves=None):
+        """Ищет лучший ход итеративным углублением.
+
+        Args:
+            max_depth (int): Максимальная глубина в полуходах.
+            time_limit (float, optional): Ограничение времени в секундах.
+            report (callable, optional): Вызывается с SearchResult после каждой итерации.
+            moves (collection, optional): Пары (from_pos, to_pos), которыми ограничен
+                выбор в корне (для разделения корневых ходов между процессами).
+
+        Returns:
+            SearchResult: Результат последней завершенной итерации.
+        """
+        start = time.perf_counter()
+        self.deadline = start + time_limit if time_limit else None
+        self.stopped = False
+        self.nodes = self.cutoffs = self.first_move_cutoffs = 0
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.tt.new_search()
+        root_moves = self.tt.legal_moves(self.board)
+        if moves is not None:
+            root_moves = [move for move in root_moves if (move.from_pos, move.to_pos) in moves]
+        if not root_moves:
+            score = -MATE_SCORE if self.tt.is_in_check(self.board) else 0
+            return SearchResult(None, score, 0, 0, time.perf_counter() - start)
+        if self.tablebases is not None and moves is None:
+            choice = self.tablebases.best_move(self.board)
+            if choice is not None:
+                move, outcome = choice
+                return SearchResult(move, _tablebase_score(outcome, 0), 0, 0, time.perf_counter() - start,
+                                    pv=self._tablebase_line())
+        result = SearchResult(root_moves[0], 0, 0, 0, 0.0)
+        for depth in range(1, max_depth + 1):
+            score, move = self._search_root(root_moves, depth)
+            if self.stopped:
+                break
+            result = SearchResult(move, score, depth, self.nodes, time.perf_counter() - start,
+                                  self.cutoffs, self.first_move_cutoffs, self._principal_variation(depth))
+            if report:
+                report(result)
+            # Мат из таблицы позиций может быть длиннее кратчайшего: углубление
+            # прекращается, только когда мат укладывается в пройденную глубину.
+            if abs(score) >= MATE_BOUND and MATE_SCORE - abs(score) <= depth:
+                break
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _search_root(self, moves, depth):
+        board = self.board
+        key = board.hash
+        entry = self.tt.probe(key)
+        alpha, beta = -INFINITY, INFINITY
+        best_move = None
+        for move in self.order_moves(moves, 0, entry[3] if entry else None):
+            board.make_move(move)
+            score = -self._negamax(depth - 1, -beta, -alpha, 1)
+            board.unmake_move()
+            if self.stopped:
+                break
+            if best_move is None or score > alpha:
+                alpha = score
+                best_move = move
+        if not self.stopped:
+            self.tt.store(key, depth, _score_to_table(alpha, 0), EXACT, (best_move.from_pos, best_move.to_pos))
+        return alpha, best_move
+
+    def _negamax(self, depth, alpha, beta, ply):
+        if depth <= 0:
+            return self._quiescence(alpha, beta, ply)
+        self.nodes += 1
+        if self.nodes % CHECK_INTERVAL == 0 and self._out_of_time():
+            return 0
+        board = self.board
+        if self.tablebases is not None:
+            outcome = self.tablebases.probe(board)
+            if outcome is not None:
+                return _tablebase_score(outcome, ply)
+        tt = self.tt
+        key = board.hash
+        entry = tt.probe(key)
+        tt_move = None
+        if entry is not None:
+            tt_depth, tt_score, bound, tt_move = entry
+            if tt_depth >= depth:
+                score = _score_from_table(tt_score, ply)
+                if (bound == EXACT or (bound == LOWER and score >= beta)
+                        or (bound == UPPER and score <= alpha)):
+                    return score
+        moves = tt.legal_moves(board)
+        if not moves:
+            return -MATE_SCORE + ply if tt.is_in_check(board) else 0
+        if ply >= MAX_PLY - 1:
+            return evaluate(board)
+        original_alpha = alpha
+        best_move = None
+        for index, move in enumerate(self.order_moves(moves, ply, tt_move)):
+            board.make_move(move)
+            score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            if self.stopped:
+                return 0
+            if score >= beta:
+                self.cutoffs += 1
+                if index == 0:
+                    self.first_move_cutoffs += 1
+                if move.captured is None:
+                    self._store_killer(move, ply)
+                    history_key = (type(move.piece), move.piece.color, move.to_pos)
+                    self.history[history_key] = self.history.get(history_key, 0) + depth * depth
+                tt.store(key, depth, _score_to_table(beta, ply), LOWER, (move.from_pos, move.to_pos))
+                return beta
+            if score > alpha:
+                alpha = score
+                best_move = move
+        if best_move is None:
+            tt.store(key, depth, _score_to_table(alpha, ply), UPPER, tt_move)
+        else:
+            tt.store(key, depth, _score_to_table(alpha, ply), EXACT, (best_move.from_pos, best_move.to_pos))
+        return alpha
+
+    def _quiescence(self, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes % CHECK_INTERVAL == 0 and self._out_of_time():
+            return 0
+        board = self.board
+        if self.tablebases is not None:
+            outcome = self.tablebases.probe(board)
+            if outcome is not None:
+                return _tablebase_score(outcome, ply)
+        stand_pat = evaluate(board)
+        if stand_pat >= beta or ply >= MAX_PLY - 1:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+        captures = [move for move in self.tt.legal_moves(board)
+                    if move.captured is not None or move.promoted_to is not None]
+        captures.sort(key=self._mvv_lva, reverse=True)
+        for move in captures:
+            board.make_move(move)
+            score = -self._quiescence(-beta, -alpha, ply + 1)
+            board.unmake_move()
+            if self.stopped:
+                return 0
+            if score >= beta:
+                return beta
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    @staticmethod
+    def _mvv_lva(move):
+        score = 0
+        if move.captured is not None:
+            score += 10 * piece_value(move.captured) - piece_value(move.piece)
+        if move.promoted_to is not None:
+            score += piece_value(move.promoted_to)
+        return score
+
+    def order_moves(self, moves, ply, best=None):
+        """Сортирует ходы по убыванию приоритета для перебора.
+
+        Args:
+            moves (list): Ходы.
+            ply (int): Расстояние от корня (для ходов-убийц).
+            best (tuple, optional): Пара (from_pos, to_pos) хода, который идет первым.
+
+        Returns:
+            list: Отсортированные ходы.
+        """
+        killers = self.killers[ply]
+        history = self.history
+
+        def priority(move):
+            squares = (move.from_pos, move.to_pos)
+            if squares == best:
+                return 1 << 30
+            if move.captured is not None or move.promoted_to is not None:
+                return (1 << 20) + self._mvv_lva(move)
+            if squares == killers[0]:
+                return 1 << 19
+            if squares == killers[1]:
+                return (1 << 19) - 1
+            return history.get((type(move.piece), move.piece.color, move.to_pos), 0)
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def _store_killer(self, move, ply):
+        squares = (move.from_pos, move.to_pos)
+        killers = self.killers[ply]
+        if killers[0] != squares:
+            killers[1] = killers[0]
+            killers[0] = squares
+
+    def _principal_variation(self, depth):
+        board = self.board
+        pv = []
+        while len(pv) < depth:
+            entry = self.tt.probe(board.hash)
+            if entry is None or entry[3] is None:
+                break
+            move = next((move for move in self.tt.legal_moves(board)
+                         if (move.from_pos, move.to_pos) == entry[3]), None)
+            if move is None:
+                break
+            pv.append(str(move))
+            board.make_move(move)
+        for _ in pv:
+            board.unmake_move()
+        return pv
+
+    def _tablebase_line(self):
+        # Вариант по таблицам эндшпиля: лучшие ходы до мата (или MAX_PLY полуходов при ничьей).
+        board = self.board
+        line = []
+        while len(line) < MAX_PLY:
+            choice = self.tablebases.best_move(board)
+            if choice is None:
+                break
+            line.append(choice[0])
+            board.make_move(choice[0])
+        for _ in line:
+            board.unmake_move()
+        return [str(move) for move in line]
+
+    def _out_of_time(self):
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.stopped = True
+        return self.stopped
+
+
+def analyze(board, time_limit=1.0, max_depth=64, report=None, tt=None, tablebases=None):
+    """Ищет лучший ход в позиции доски за заданное время.
+
+    Args:
+        board (Board): Доска; позиция не меняется.
+        time_limit (float, optional): Ограничение времени в секундах.
+        max_depth (int): Максимальная глубина в полуходах.
+        report (callable, optional): Вызывается с SearchResult после каждой итерации.
+        tt (TranspositionTable, optional): Таблица позиций для повторного использования.
+        tablebases (Tablebases, optional): Таблицы эндшпиля.
+
+    Returns:
+        SearchResult: Лучший ход, оценка, глубина и статистика поиска.
+    """
+    return Engine(board, tt, tablebases).search(max_depth, time_limit, report)
+
+
+def format_score(result):
+    """Возвращает оценку в виде "+0.35" или "мат в 3"."""
+    mate_in = result.mate_in
+    if mate_in is not None:
+        return f"мат в {mate_in}" if mate_in > 0 else f"мат через {-mate_in}"
+    return f"{result.score / 100:+.2f}"
+
+
+def format_result(result):
+    """Возвращает строку отчета о поиске."""
+    cut_rate = result.first_move_cutoffs / result.cutoffs if result.cutoffs else 0
+    return (f"глубина {result.depth}: {result.move}  оценка {format_score(result)}  "
+            f"узлов {result.nodes}  {result.nps:.0f} узл/с  отсечений первым ходом {cut_rate:.0%}  "
+            f"вариант: {', '.join(result.pv)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Поиск лучшего хода.")
+    parser.add_argument("--fen", help="позиция в FEN (по умолчанию — начальная)")
+    parser.add_argument("--version", type=int, choices=(1, 2), default=1, help="вариант начальной расстановки")
+    parser.add_argument("--time", type=float, default=2.0, help="ограничение времени в секундах")
+    parser.add_argument("--depth", type=int, default=64, help="максимальная глубина")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="grid", help="тип доски")
+    parser.add_argument("--hash", type=float, default=16, help="размер таблицы позиций в МБ")
+    parser.add_argument("--tablebases", help="каталог таблиц эндшпиля (tablebase.py generate)")
+    args = parser.parse_args()
+
+    board = create_board(args.backend)
+    if args.fen:
+        load_fen(board, args.fen)
+    else:
+        board.setup_initial_position(args.version)
+    tt = TranspositionTable(args.hash)
+    tablebases = Tablebases(args.tablebases) if args.tablebases else None
+    result = analyze(board, args.time, args.depth, report=lambda result: print(format_result(result)), tt=tt,
+                     tablebases=tablebases)
+    if tablebases is not None and result.depth == 0 and result.move is not None:
+        print(format_result(result))
+    print(f"Лучший ход: {result.move}")
+    print(f"Таблица позиций: попаданий {tt.hit_rate:.0%}, заполнено {tt.usage():.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+from board import REGULAR_PIECES, parse_square, square_name
+from bitboard import create_board
+from pieces import Pawn, Rook, King
+from zobrist import (castling_rights,
+                     WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE)
+
+PIECE_BY_SYMBOL = {piece_class("white").symbol: piece_class for piece_class in REGULAR_PIECES}
+CASTLING_FLAGS = {"K": WHITE_KINGSIDE, "Q": WHITE_QUEENSIDE, "k": BLACK_KINGSIDE, "q": BLACK_QUEENSIDE}
+START_FEN = {
+    1: "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    2: "cmdqkdmc/pppppppp/8/8/8/8/PPPPPPPP/CMDQKDMC w - - 0 1",
+}
+
+
+class PiecePool:
+    """Запас объектов фигур для повторного использования при загрузке многих позиций.
+
+    Фигуры, снятые с доски, возвращаются в запас и выдаются снова для следующей
+    позиции, поэтому поток из тысяч позиций не создает новых объектов Piece.
+    """
+
+    def __init__(self):
+        self._free = {}
+
+    def take(self, piece_class, color):
+        """Выдает фигуру заданного класса и цвета (из запаса или новую)."""
+        free = self._free.get((piece_class, color))
+        if free:
+            return free.pop()
+        return piece_class(color)
+
+    def release(self, pieces):
+        """Возвращает фигуры в запас."""
+        for piece in pieces:
+            self._free.setdefault((type(piece), piece.color), []).append(piece)
+
+
+def board_to_fen(board):
+    """Записывает позицию в FEN (с символами новых фигур: C/c, D/d, M/m).
+
+    Счетчик полуходов без взятий и ходов пешек не ведется и всегда записывается как 0.
+
+    Args:
+        board (Board): Доска.
+
+    Returns:
+        str: Строка FEN.
+    """
+    rows = []
+    for row in range(7, -1, -1):
+        line = ""
+        empty = 0
+        for col in range(8):
+            piece = board.grid[row][col]
+            if piece is None:
+                empty += 1
+                continue
+            if empty:
+                line += str(empty)
+                empty = 0
+            line += piece.symbol
+        if empty:
+            line += str(empty)
+        rows.append(line)
+    rights = castling_rights(board)
+    castling = "".join(symbol for symbol, flag in CASTLING_FLAGS.items() if rights & flag) or "-"
+    target = board.get_en_passant_target()
+    en_passant = "-" if target is None else square_name(target).lower()
+    fullmove = board.move_count // 2 + 1
+    return f"{'/'.join(rows)} {board.turn[0]} {castling} {en_passant} 0 {fullmove}"
+
+
+def load_fen(board, fen, pool=None):
+    """Загружает позицию из FEN (или первых четырех полей EPD) в существующую доску.
+
+    Права на рокировку переводятся во флаги has_moved короля и ладей, поле взятия
+    на проходе — в board.en_passant_target (см. set_en_passant).
+
+    Args:
+        board (Board): Доска, позиция на которой будет заменена.
+        fen (str): Строка FEN.
+        pool (PiecePool, optional): Запас фигур; снятые фигуры возвращаются в него.
+
+    Returns:
+        Board: Та же доска с новой позицией.
+
+    Raises:
+        ValueError: Если строка FEN записана неверно.
+    """
+    fields = fen.split()
+    if len(fields) < 4:
+        raise ValueError(f"Неверная строка FEN: {fen}")
+    placement, side, castling, en_passant = fields[:4]
+    ranks = placement.split("/")
+    if len(ranks) != 8 or side not in ("w", "b"):
+        raise ValueError(f"Неверная строка FEN: {fen}")
+    removed = board.clear()
+    if pool is not None:
+        pool.release(removed)
+    for index, rank in enumerate(ranks):
+        row = 7 - index
+        col = 0
+        for symbol in rank:
+            if symbol.isdigit():
+                col += int(symbol)
+                continue
+            piece_class = PIECE_BY_SYMBOL.get(symbol.upper())
+            if piece_class is None or col > 7:
+                raise ValueError(f"Неверная строка FEN: {fen}")
+            color = "white" if symbol.isupper() else "black"
+            piece = pool.take(piece_class, color) if pool is not None else piece_class(color)
+            board.place_piece(piece, row, col)
+            col += 1
+        if col != 8:
+            raise ValueError(f"Неверная строка FEN: {fen}")
+    rights = 0
+    if castling != "-":
+        for symbol in castling:
+            if symbol not in CASTLING_FLAGS:
+                raise ValueError(f"Неверные права на рокировку: {castling}")
+            rights |= CASTLING_FLAGS[symbol]
+    set_castling_rights(board, rights)
+    board.turn = "white" if side == "w" else "black"
+    if len(fields) >= 6 and fields[5].isdigit():
+        board.move_count = (int(fields[5]) - 1) * 2 + (1 if side == "b" else 0)
+    if en_passant != "-":
+        set_en_passant(board, parse_square(en_passant))
+    return board
+
+
+def set_castling_rights(board, rights):
+    """Выставляет флаги has_moved пешек, ладей и королей по правам на рокировку.
+
+    Пешка считается сходившей, если стоит не на начальной горизонтали; король и
+    ладья — если для них нет права на рокировку.
+
+    Args:
+        board (Board): Доска с расставленными фигурами.
+        rights (int): Битовая маска из WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE.
+    """
+    for color, home_row, pawn_row, kingside, queenside in (("white", 0, 1, WHITE_KINGSIDE, WHITE_QUEENSIDE),
+                                                             ("black", 7, 6, BLACK_KINGSIDE, BLACK_QUEENSIDE)):
+        for pawn in board.get_pieces(color, Pawn):
+            pawn.has_moved = pawn.position[0] != pawn_row
+        for rook in board.get_pieces(color, Rook):
+            rook.has_moved = not ((rook.position == (home_row, 7) and rights & kingside) or
+                                  (rook.position == (home_row, 0) and rights & queenside))
+        for king in board.get_pieces(color, King):
+            king.has_moved = not (king.position == (home_row, 4) and rights & (kingside | queenside))
+
+
+def set_en_passant(board, target):
+    """Делает возможным взятие на проходе на клетку target.
+
+    Клетка сохраняется в board.en_passant_target, а не в истории ходов, поэтому
+    отмена хода не может ее снять; она действует, пока на доске не сделан ход.
+
+    Args:
+        board (Board): Доска.
+        target (tuple): Клетка (row, col), через которую прошла пешка.
+
+    Raises:
+        ValueError: Если за клеткой target нет пешки, которая могла сделать двойной ход.
+    """
+    row, col = target
+    direction = 1 if row == 2 else -1
+    pawn = board.get_piece(row + direction, col)
+    if not isinstance(pawn, Pawn) or row not in (2, 5):
+        raise ValueError(f"Неверное поле взятия на проходе: {square_name(target)}")
+    board.en_passant_target = target
+
+
+def parse_epd_operations(text):
+    """Разбирает операции EPD вида 'id "name"; D1 20; D2 400;'.
+
+    Args:
+        text (str): Часть строки EPD после четырех полей позиции.
+
+    Returns:
+        dict: Словарь код операции -> операнд (строка без кавычек).
+    """
+    operations = {}
+    for chunk in text.split(";"):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        opcode, _, operand = chunk.partition(" ")
+        operations[opcode] = operand.strip().strip('"')
+    return operations
+
+
+def iter_epd(source, board=None, backend="grid"):
+    """Построчно читает файл EPD, загружая каждую позицию в одну и ту же доску.
+
+    Файл не читается в память целиком; фигуры переиспользуются через PiecePool.
+    Выдаваемая доска перезаписывается следующей позицией, поэтому результаты по
+    ней нужно получить до перехода к следующей строке.
+
+    Args:
+        source (str or file): Путь к файлу или открытый текстовый файл.
+        board (Board, optional): Доска для повторного использования.
+        backend (str): Тип доски, если board не задана.
+
+    Yields:
+        tuple: (номер строки, доска, словарь операций EPD).
+    """
+    if board is None:
+        board = create_board(backend)
+    pool = PiecePool()
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as stream:
+            yield from _iter_epd_lines(stream, board, pool)
+    else:
+        yield from _iter_epd_lines(source, board, pool)
+
+
+def _iter_epd_lines(stream, board, pool):
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = line.split(maxsplit=4)
+        load_fen(board, " ".join(fields[:4]), pool)
+        operations = parse_epd_operations(fields[4]) if len(fields) > 4 else {}
+        yield line_number, board, operations
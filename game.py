@@ -1,31 +1,103 @@
-from board import Board, Move
+import argparse
+import time
+
+from board import parse_square, square_name
+from bitboard import create_board
+from engine import analyze, format_result
+from instrument import PROFILER
+from ponder import Ponderer
+from render import TerminalRenderer
+from timeline import Timeline
+from transposition import TranspositionTable
+
+COMMANDS = ("quit", "undo", "redo", "goto", "hint", "analyze", "threat", "stats")
+
+
+class MoveResult:
+    """Результат попытки сделать ход через ChessGame.apply.
+
+    Args:
+        ok (bool): True, если ход выполнен.
+        move (Move, optional): Выполненный ход.
+        error (str, optional): Причина отказа, если ход не выполнен.
+        check (bool): Объявлен ли шах сопернику.
+        checkmate (bool): Поставлен ли мат сопернику.
+    """
+
+    def __init__(self, ok, move=None, error=None, check=False, checkmate=False):
+        self.ok = ok
+        self.move = move
+        self.error = error
+        self.check = check
+        self.checkmate = checkmate
+
+
+class GameStatus:
+    """Состояние партии для игрока, который сейчас ходит.
+
+    Args:
+        turn (str): Цвет игрока, который ходит ("white" или "black").
+        move_count (int): Количество сделанных ходов.
+        check (bool): Находится ли король ходящего игрока под шахом.
+        checkmate (bool): Мат ходящему игроку.
+        stalemate (bool): Пат: шаха нет, но и легальных ходов нет.
+    """
+
+    def __init__(self, turn, move_count, check, checkmate, stalemate):
+        self.turn = turn
+        self.move_count = move_count
+        self.check = check
+        self.checkmate = checkmate
+        self.stalemate = stalemate
+        self.game_over = checkmate or stalemate
+        self.winner = ("black" if turn == "white" else "white") if checkmate else None
+
 
 class ChessGame:
-    """Класс, управляющий шахматной игрой с консольным интерфейсом и дополнительными командами.
+    """Класс, управляющий шахматной игрой: программный интерфейс и консольный клиент.
 
+    Методы apply, legal_moves, status, undo, hint и threats ничего не печатают и не
+    читают ввод, поэтому партии можно вести из кода. Консольный цикл play построен
+    поверх них.
     """
-    def __init__(self):
-        """Инициализирует новую игру, создает доску и устанавливает начальный ход."""
+    def __init__(self, version=None, backend="grid", ansi=False, ponder=False):
+        """Инициализирует новую игру и расставляет фигуры.
+
+        Args:
+            version (int, optional): Вариант расстановки (1 или 2). Если не задан,
+                версия запрашивается у пользователя.
+            backend (str): Способ хранения доски: "grid" или "bitboard".
+            ansi (bool): Перерисовывать в терминале только изменившиеся клетки
+                (нужен терминал с поддержкой ANSI); иначе доска выводится целиком.
+            ponder (bool): Пока консоль ждет ввода, заранее считать в фоне ходы,
+                шах, мат и угрозы для текущей позиции и позиций после её ходов.
+        """
+
+        self.board = create_board(backend)
+        self.tt = None
+        self.renderer = TerminalRenderer() if ansi else None
+        self.ponderer = Ponderer(self.board) if ponder else None
+        if version is None:
+            self.setup_game()
+        else:
+            self.board.setup_initial_position(version)
+        self.timeline = Timeline(self.board)
+
+    @property
+    def current_turn(self):
+        """Цвет игрока, который сейчас ходит ("white" или "black")."""
+        return self.board.turn
 
-        self.board = Board()
-        self.current_turn = "white"
-        self.setup_game()
-        
     def setup_game(self):
         """Настраивает начальную позицию фигур, запрашивая версию игры у пользователя."""
- 
+
         while True:
             version = input("Выберите версию игры (1 - классическая, 2 - с новыми фигурами): ")
             if version in ["1", "2"]:
                 self.board.setup_initial_position(int(version))
                 break
             print("Неверный выбор. Введите 1 или 2.")
-        
-    def switch_turn(self):
-        """Переключает текущего игрока между белыми и черными."""
-        
-        self.current_turn = "black" if self.current_turn == "white" else "white"
-        
+
     def pos_to_coords(self, pos):
         """Преобразует шахматную нотацию в координаты на доске.
 
@@ -36,70 +108,269 @@ class ChessGame:
             tuple: Кортеж (row, col) с координатами (например, (1, 4)).
         """
 
-        col = ord(pos[0].upper()) - ord('A')
-        row = int(pos[1]) - 1
-        return (row, col)
-        
+        return parse_square(pos)
+
+    def apply(self, cmd):
+        """Выполняет ход, записанный в формате консоли.
+
+        Args:
+            cmd (str): Ход вида "E2 E4".
+
+        Returns:
+            MoveResult: Результат хода; при отказе ok=False и error содержит причину.
+        """
+        try:
+            from_pos_str, to_pos_str = cmd.split()
+            from_pos = parse_square(from_pos_str)
+            to_pos = parse_square(to_pos_str)
+        except ValueError:
+            return MoveResult(False, error="Неверный ввод")
+        piece = self.board.get_piece(*from_pos)
+        if not piece or piece.color != self.current_turn:
+            return MoveResult(False, error="Неверный ввод")
+        if not self.board.move_piece(from_pos, to_pos):
+            return MoveResult(False, error="Неверный ход")
+        self.timeline.push(self.board.move_history[-1])
+        opponent = self.current_turn
+        check = self.board.is_in_check(opponent)
+        checkmate = check and self.board.is_checkmate(opponent)
+        return MoveResult(True, move=self.board.move_history[-1], check=check, checkmate=checkmate)
+
+    def legal_moves(self):
+        """Возвращает все легальные ходы игрока, который сейчас ходит.
+
+        Returns:
+            list: Список строк вида "E2 E4".
+        """
+        moves = self.board.position_info().moves
+        return [f"{square_name(from_pos)} {square_name(to_pos)}" for from_pos, targets in moves.items()
+                for to_pos in targets]
+
+    def status(self):
+        """Возвращает состояние партии для игрока, который сейчас ходит.
+
+        Returns:
+            GameStatus: Шах, мат, пат, очередь хода и число сделанных ходов.
+        """
+        info = self.board.position_info()
+        return GameStatus(self.current_turn, self.board.move_count, info.check, info.checkmate, info.stalemate)
+
+    def undo(self, n=1):
+        """Отменяет последние n ходов (или меньше, если столько не сделано).
+
+        Args:
+            n (int): Количество ходов для отмены.
+
+        Returns:
+            int: Сколько ходов действительно отменено.
+        """
+        return self.timeline.undo(n)
+
+    def redo(self, n=1):
+        """Повторяет n отмененных ходов (или меньше, если столько не отменено).
+
+        Args:
+            n (int): Количество ходов для повтора.
+
+        Returns:
+            int: Сколько ходов действительно повторено.
+        """
+        return self.timeline.redo(n)
+
+    def goto(self, ply):
+        """Переходит к позиции после указанного полухода партии.
+
+        Args:
+            ply (int): Номер полухода (0 — начальная позиция).
+
+        Raises:
+            ValueError: Если такого полухода в партии нет.
+        """
+        self.timeline.goto(ply)
+
+    def hint(self, pos):
+        """Возвращает клетки, на которые может пойти фигура ходящего игрока.
+
+        Args:
+            pos (str): Клетка фигуры в шахматной нотации (например, "E2").
+
+        Returns:
+            list: Список кортежей (row, col) — допустимые позиции для хода.
+
+        Raises:
+            ValueError: Если клетка задана неверно или на ней нет своей фигуры.
+        """
+        piece = self.board.get_piece(*parse_square(pos))
+        if not piece or piece.color != self.current_turn:
+            raise ValueError(f"На клетке {pos} нет фигуры ходящего игрока")
+        return self.board.get_legal_moves(piece)
+
+    def threats(self):
+        """Возвращает клетки фигур ходящего игрока, находящихся под боем.
+
+        Returns:
+            list: Список кортежей (row, col) с позициями угрожаемых фигур.
+        """
+        return self.board.get_threatened_pieces(self.current_turn)
+
+    def analyze(self, time_limit=2.0, max_depth=64):
+        """Ищет лучший ход для игрока, который сейчас ходит.
+
+        Таблица позиций создается при первом вызове и сохраняется между вызовами.
+
+        Args:
+            time_limit (float): Ограничение времени в секундах.
+            max_depth (int): Максимальная глубина в полуходах.
+
+        Returns:
+            SearchResult: Лучший ход, оценка и статистика поиска.
+        """
+        if self.tt is None:
+            self.tt = TranspositionTable()
+        return analyze(self.board, time_limit, max_depth, tt=self.tt)
+
     def play(self):
         """Запускает основной игровой цикл с обработкой ходов и команд."""
 
         while True:
-            self.board.display()
+            self.board.display(renderer=self.renderer)
             print(f"Ход {'белых' if self.current_turn == 'white' else 'черных'}")
-            if self.board.is_in_check(self.current_turn):
+            status = self.status()
+            if status.check:
                 print("Шах!")
-            if self.board.is_checkmate(self.current_turn):
-                print(f"Мат! {'Белые' if self.current_turn == 'black' else 'Чёрные'} победили!")
+            if status.checkmate:
+                print(f"Мат! {'Белые' if status.winner == 'white' else 'Чёрные'} победили!")
+                return
+            if status.stalemate:
+                print("Пат! Ничья.")
                 return
             while True:
-                cmd = input("Введите ход (например, 'E1 G1'), или команду ('hint', 'undo', 'threat', 'quit'): ")
-                if cmd.lower() == "quit":
+                if self.ponderer is not None:
+                    self.ponderer.start()
+                try:
+                    cmd = input("Введите ход (например, 'E1 G1'), или команду ('hint', 'undo [n]', 'redo [n]', "
+                                "'goto <полуход>', 'threat', 'analyze [сек]', 'stats', 'quit'): ")
+                finally:
+                    if self.ponderer is not None:
+                        self.ponderer.stop()
+                if not PROFILER.enabled:
+                    outcome = self._handle_command(cmd)
+                else:
+                    start = time.perf_counter()
+                    outcome = self._handle_command(cmd)
+                    name = cmd.lower().split()[:1]
+                    PROFILER.record_command(name[0] if name and name[0] in COMMANDS else "move",
+                                            time.perf_counter() - start)
+                if outcome == "quit":
                     return
-                elif cmd.lower() == "undo":
-                    if self.board.undo_last_move():
-                        self.switch_turn()
-                        print("Ход отменен")
+                if outcome == "next":
                     break
-                elif cmd.lower() == "hint":
-                    pos = input("Введите позицию фигуры для подсказки (например, 'E2'): ")
-                    try:
-                        coords = self.pos_to_coords(pos)
-                        piece = self.board.get_piece(*coords)
-                        if piece and piece.color == self.current_turn:
-                            moves = piece.get_valid_moves(self.board)
-                            self.board.display(highlight_moves=moves)
-                        else:
-                            print("Неверный ввод. Попробуйте снова.")
-                    except:
-                        print("Неверный ввод. Попробуйте снова.")
-                    continue
-                elif cmd.lower() == "threat":
-                    threatened = self.board.get_threatened_pieces(self.current_turn)
-                    if threatened:
-                        self.board.display(threatened=threatened)
-                        king_threat = any(self.board.get_piece(*pos).symbol in ["K", "k"] for pos in threatened)
-                        if king_threat:
-                            print("Шах королю!")
-                        print(f"Угрожаемые фигуры: {len(threatened)}")
-                    else:
-                        print("Нет угрожаемых фигур.")
-                    continue
-                try:
-                    from_pos_str, to_pos_str = cmd.split()
-                    from_pos = self.pos_to_coords(from_pos_str)
-                    to_pos = self.pos_to_coords(to_pos_str)
-                    piece = self.board.get_piece(*from_pos)
-                    if not piece or piece.color != self.current_turn:
-                        print("Неверный ввод. Попробуйте снова.")
-                        continue
-                    if self.board.move_piece(from_pos, to_pos):
-                        self.switch_turn()
-                        break
-                    else:
-                        print("Неверный ход. Попробуйте снова.")
-                except:
-                    print("Неверный ввод. Попробуйте снова.")
+
+    def _handle_command(self, cmd):
+        # Возвращает "quit" для выхода, "next" — чтобы заново показать доску, "again" — чтобы снова спросить ввод.
+        words = cmd.lower().split()
+        if cmd.lower() == "quit":
+            return "quit"
+        elif words[:1] in (["undo"], ["redo"], ["goto"]):
+            command, *args = words
+            try:
+                count = int(args[0]) if args else (None if command == "goto" else 1)
+                if count is None or count < 0:
+                    raise ValueError
+                if command == "undo":
+                    print(f"Отменено ходов: {self.undo(count)}")
+                elif command == "redo":
+                    print(f"Повторено ходов: {self.redo(count)}")
+                else:
+                    self.goto(count)
+            except ValueError:
+                print("Неверный ввод. Попробуйте снова.")
+                return "again"
+            return "next"
+        elif cmd.lower() == "hint":
+            pos = input("Введите позицию фигуры для подсказки (например, 'E2'): ")
+            try:
+                self.board.display(highlight_moves=self.hint(pos), renderer=self.renderer)
+            except ValueError:
+                print("Неверный ввод. Попробуйте снова.")
+            return "again"
+        elif words[:1] == ["analyze"]:
+            args = cmd.split()[1:]
+            try:
+                time_limit = float(args[0]) if args else 2.0
+            except ValueError:
+                print("Неверный ввод. Попробуйте снова.")
+                return "again"
+            result = self.analyze(time_limit)
+            if result.move is None:
+                print("Нет легальных ходов.")
+            else:
+                print(format_result(result))
+                print(f"Рекомендуемый ход: {result.move}")
+            return "again"
+        elif cmd.lower() == "threat":
+            threatened = self.threats()
+            if threatened:
+                self.board.display(threatened=threatened, renderer=self.renderer)
+                king_threat = any(self.board.get_piece(*pos).symbol in ["K", "k"] for pos in threatened)
+                if king_threat:
+                    print("Шах королю!")
+                print(f"Угрожаемые фигуры: {len(threatened)}")
+            else:
+                print("Нет угрожаемых фигур.")
+            return "again"
+        elif words[:1] == ["stats"]:
+            self._stats_command(cmd.split()[1:])
+            return "again"
+        result = self.apply(cmd)
+        if result.ok:
+            return "next"
+        if result.error == "Неверный ход":
+            print("Неверный ход. Попробуйте снова.")
+        else:
+            print("Неверный ввод. Попробуйте снова.")
+        return "again"
+
+    def _stats_command(self, args):
+        # stats — показать, stats on/off — включить/выключить, stats reset — обнулить, stats json <файл> — сохранить.
+        action = args[0].lower() if args else "show"
+        if action == "on":
+            PROFILER.enable()
+            print("Профилирование включено.")
+        elif action == "off":
+            PROFILER.disable()
+            print("Профилирование выключено.")
+        elif action == "reset":
+            PROFILER.reset()
+            print("Статистика обнулена.")
+        elif action == "json" and len(args) == 2:
+            try:
+                PROFILER.dump(args[1])
+            except OSError as error:
+                print(f"Не удалось сохранить: {error}")
+            else:
+                print(f"Статистика сохранена в {args[1]}")
+        elif action == "show":
+            if not PROFILER.enabled and not PROFILER.calls:
+                print("Профилирование выключено: 'stats on' или запуск с --profile.")
+            else:
+                print(PROFILER.format_stats())
+        else:
+            print("Неверный ввод. Используйте 'stats', 'stats on', 'stats off', 'stats reset' или 'stats json <файл>'.")
 
 if __name__ == "__main__":
-    game = ChessGame()
-    game.play()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Консольные шахматы.")
+    parser.add_argument("--backend", choices=["grid", "bitboard"], default="grid", help="способ хранения доски")
+    parser.add_argument("--ansi", action="store_true", help="перерисовывать только изменившиеся клетки (терминал ANSI)")
+    parser.add_argument("--profile", action="store_true", help="считать вызовы и время проверок правил (команда stats)")
+    parser.add_argument("--ponder", action="store_true", help="считать ходы и угрозы в фоне, пока ждем ввода")
+    parser.add_argument("--stats-json", help="сохранить статистику профилирования в файл JSON при выходе")
+    args = parser.parse_args()
+    if args.profile or args.stats_json:
+        PROFILER.enable()
+    game = ChessGame(backend=args.backend, ansi=args.ansi, ponder=args.ponder)
+    try:
+        game.play()
+    finally:
+        if args.stats_json:
+            PROFILER.dump(args.stats_json)
@@ -0,0 +1,275 @@
+import argparse
+import mmap
+import struct
+import sys
+from array import array
+
+from bitboard import create_board
+from board import parse_square, square_name
+from pieces import Queen, Rook, Bishop, Knight, Cat, Dog, Rabbit
+from replay import read_games
+
+MAGIC = b"CHG1"
+HEADER = struct.Struct("<4sIQ")
+INDEX_ENTRY = struct.Struct("<QII")
+PROMOTION_CLASSES = (None, Queen, Rook, Bishop, Knight, Cat, Dog, Rabbit)
+PROMOTION_CODES = {piece_class: code for code, piece_class in enumerate(PROMOTION_CLASSES) if piece_class}
+
+
+def encode_move(from_pos, to_pos, promotion=None, version=1):
+    """Упаковывает ход в 16-битное число.
+
+    Биты 0-5 — начальная клетка (row * 8 + col), 6-11 — конечная клетка,
+    12-14 — класс фигуры превращения (индекс в PROMOTION_CLASSES), 15 — вариант
+    (0 — классический, 1 — с новыми фигурами).
+
+    Args:
+        from_pos (tuple): Начальная клетка (row, col).
+        to_pos (tuple): Конечная клетка (row, col).
+        promotion (type, optional): Класс фигуры превращения.
+        version (int): Вариант расстановки (1 или 2).
+
+    Returns:
+        int: Упакованный ход.
+    """
+    code = from_pos[0] * 8 + from_pos[1]
+    code |= (to_pos[0] * 8 + to_pos[1]) << 6
+    if promotion is not None:
+        code |= PROMOTION_CODES[promotion] << 12
+    if version == 2:
+        code |= 1 << 15
+    return code
+
+
+def decode_move(code):
+    """Распаковывает ход, записанный encode_move.
+
+    Returns:
+        tuple: (from_pos, to_pos, класс превращения или None, вариант расстановки).
+    """
+    from_square = code & 63
+    to_square = (code >> 6) & 63
+    return ((from_square // 8, from_square % 8), (to_square // 8, to_square % 8),
+            PROMOTION_CLASSES[(code >> 12) & 7], 2 if code >> 15 else 1)
+
+
+def history_to_codes(move_history, version):
+    """Переводит move_history доски в массив упакованных ходов.
+
+    Args:
+        move_history (list): Список объектов Move.
+        version (int): Вариант расстановки, с которого начата партия.
+
+    Returns:
+        array: Массив array("H") упакованных ходов.
+    """
+    return array("H", (encode_move(move.from_pos, move.to_pos,
+                                   type(move.promoted_to) if move.promoted_to else None, version)
+                       for move in move_history))
+
+
+def codes_to_history(codes, version, board=None, backend="grid"):
+    """Воспроизводит упакованные ходы с начальной расстановки и восстанавливает move_history.
+
+    Вариант не угадывается по ходам: у партии без ходов его не из чего взять.
+    Для партий из GameArchive он хранится в индексе (game_info).
+
+    Args:
+        codes (iterable): Упакованные ходы одной партии.
+        version (int): Вариант расстановки (1 или 2).
+        board (Board, optional): Доска для повторного использования.
+        backend (str): Тип доски, если board не задана.
+
+    Returns:
+        Board: Доска после последнего хода; её move_history содержит все ходы партии.
+
+    Raises:
+        ValueError: Если вариант неизвестен или ход невозможен в получившейся позиции.
+    """
+    if version not in (1, 2):
+        raise ValueError(f"Неизвестный вариант расстановки: {version}")
+    if board is None:
+        board = create_board(backend)
+    board.clear()
+    board.setup_initial_position(version)
+    for code in codes:
+        from_pos, to_pos, promotion, _ = decode_move(code)
+        move = next((move for move in board.generate_legal_moves(board.turn)
+                     if move.from_pos == from_pos and move.to_pos == to_pos), None)
+        if move is None:
+            raise ValueError(f"Недопустимый ход {square_name(from_pos)} {square_name(to_pos)}")
+        if promotion is not None and move.promoted_to is not None and promotion is not type(move.promoted_to):
+            move.promoted_to = promotion(move.piece.color)
+        board.make_move(move)
+    return board
+
+
+class GameWriter:
+    """Записывает партии в двоичный файл: заголовок, блоки ходов и индекс смещений.
+
+    Используется как контекстный менеджер; индекс дописывается при закрытии.
+
+    Args:
+        path (str): Путь к создаваемому файлу.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, 0, 0))
+        self._index = []
+
+    def add_game(self, codes, version):
+        """Дописывает партию, заданную упакованными ходами."""
+        codes = array("H", codes)
+        if sys.byteorder == "big":
+            codes.byteswap()
+        self._index.append((self._file.tell(), len(codes), version))
+        codes.tofile(self._file)
+
+    def add_history(self, move_history, version):
+        """Дописывает партию, заданную move_history доски."""
+        self.add_game(history_to_codes(move_history, version), version)
+
+    def close(self):
+        """Записывает индекс и заголовок и закрывает файл."""
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        for entry in self._index:
+            self._file.write(INDEX_ENTRY.pack(*entry))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, len(self._index), index_offset))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GameArchive:
+    """Двоичный архив партий с произвольным доступом через mmap.
+
+    Файл не читается целиком: по индексу находится блок нужной партии, а ход
+    читается прямо из отображенной памяти.
+
+    Args:
+        path (str): Путь к файлу, созданному GameWriter.
+
+    Raises:
+        ValueError: Если файл не является архивом партий.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, self._index_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Файл {path} не является архивом партий")
+
+    def __len__(self):
+        return self._count
+
+    def game_info(self, number):
+        """Возвращает (смещение, число полуходов, вариант) партии с индексом number."""
+        if not 0 <= number < self._count:
+            raise IndexError(number)
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + number * INDEX_ENTRY.size)
+
+    def game(self, number):
+        """Возвращает упакованные ходы партии в виде array("H")."""
+        offset, plies, _ = self.game_info(number)
+        codes = array("H", self._map[offset:offset + plies * 2])
+        if sys.byteorder == "big":
+            codes.byteswap()
+        return codes
+
+    def ply(self, number, ply):
+        """Возвращает упакованный ход ply (с 0) партии number, не читая остальные ходы."""
+        offset, plies, _ = self.game_info(number)
+        if not 0 <= ply < plies:
+            raise IndexError(ply)
+        return struct.unpack_from("<H", self._map, offset + ply * 2)[0]
+
+    def __iter__(self):
+        for number in range(self._count):
+            yield self.game(number)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def pack_archive(source, path, backend="grid"):
+    """Переводит текстовый архив партий (формат replay.read_games) в двоичный.
+
+    Партии, начатые с позиции FEN, и партии с неверными ходами пропускаются.
+
+    Returns:
+        tuple: (записано партий, пропущено партий).
+    """
+    board = create_board(backend)
+    written = skipped = 0
+    with GameWriter(path) as writer:
+        for game in read_games(source):
+            if game.fen:
+                skipped += 1
+                continue
+            board.clear()
+            board.setup_initial_position(game.version)
+            if all(_play_text_move(board, text) for text in game.moves):
+                writer.add_history(board.move_history, game.version)
+                written += 1
+            else:
+                skipped += 1
+    return written, skipped
+
+
+def _play_text_move(board, text):
+    try:
+        from_pos, to_pos = (parse_square(square) for square in text.split())
+    except ValueError:
+        return False
+    piece = board.get_piece(*from_pos)
+    return piece is not None and piece.color == board.turn and board.move_piece(from_pos, to_pos)
+
+
+def unpack_archive(path, stream):
+    """Записывает двоичный архив в текстовом формате replay.read_games."""
+    with GameArchive(path) as archive:
+        for number, codes in enumerate(archive):
+            _, _, version = archive.game_info(number)
+            stream.write(f"# version {version}\n")
+            for code in codes:
+                from_pos, to_pos, _, _ = decode_move(code)
+                stream.write(f"{square_name(from_pos)} {square_name(to_pos)}\n")
+            stream.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Двоичный архив партий: упаковка и распаковка.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    pack = subparsers.add_parser("pack", help="текстовый архив -> двоичный")
+    pack.add_argument("source")
+    pack.add_argument("target")
+    unpack = subparsers.add_parser("unpack", help="двоичный архив -> текстовый (в стандартный вывод)")
+    unpack.add_argument("source")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        written, skipped = pack_archive(args.source, args.target)
+        print(f"Записано партий: {written}, пропущено: {skipped}")
+    else:
+        unpack_archive(args.source, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import functools
+import json
+import threading
+import time
+
+from bitboard import BitboardBoard
+from board import Board
+from pieces import Piece
+
+BOARD_METHODS = ("is_in_check", "is_square_attacked", "is_checkmate", "get_threatened_pieces", "move_piece")
+
+
+def _all_subclasses(cls):
+    result = [cls]
+    for subclass in cls.__subclasses__():
+        result.extend(_all_subclasses(subclass))
+    return result
+
+
+def _instrumented_methods():
+    # Пары (класс, имя метода) для каждого класса, где метод определен сам,
+    # а не унаследован: так каждая реализация учитывается отдельно.
+    targets = [(cls, "get_valid_moves") for cls in _all_subclasses(Piece) if "get_valid_moves" in vars(cls)]
+    for cls in (Board, BitboardBoard):
+        targets.extend((cls, name) for name in BOARD_METHODS if name in vars(cls))
+    return targets
+
+
+class Profiler:
+    """Счетчики и время вызовов правил игры; включаются по требованию.
+
+    enable подменяет get_valid_moves каждого класса фигуры и методы доски
+    (is_in_check, is_square_attacked, is_checkmate, get_threatened_pieces,
+    move_piece) обертками, которые считают вызовы и суммарное время, а также
+    вложенные вызовы: сколько раз метод вызывался изнутри другого. disable
+    возвращает исходные методы, поэтому выключенный профилировщик ничего не стоит.
+
+    Время консольных команд записывается через record_command.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._originals = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Обнуляет собранную статистику."""
+        self.calls = {}
+        self.nested = {}
+        self.commands = {}
+
+    def enable(self):
+        """Устанавливает обертки; повторный вызов ничего не делает."""
+        if self.enabled:
+            return
+        for cls, name in _instrumented_methods():
+            original = vars(cls)[name]
+            self._originals.append((cls, name, original))
+            setattr(cls, name, self._wrap(original, f"{cls.__name__}.{name}"))
+        self.enabled = True
+
+    def disable(self):
+        """Снимает обертки; собранная статистика сохраняется."""
+        for cls, name, original in reversed(self._originals):
+            setattr(cls, name, original)
+        self._originals = []
+        self.enabled = False
+
+    def _wrap(self, func, name):
+        local = self._local
+        lock = self._lock
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = getattr(local, "stack", None)
+            if stack is None:
+                stack = local.stack = []
+            parent = stack[-1] if stack else None
+            stack.append(name)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                with lock:
+                    entry = self.calls.setdefault(name, [0, 0.0])
+                    entry[0] += 1
+                    entry[1] += elapsed
+                    if parent is not None:
+                        children = self.nested.setdefault(parent, {})
+                        children[name] = children.get(name, 0) + 1
+
+        return wrapper
+
+    def record_command(self, name, elapsed):
+        """Учитывает время выполнения консольной команды.
+
+        Args:
+            name (str): Имя команды ("move", "undo", "hint", ...).
+            elapsed (float): Время в секундах.
+        """
+        with self._lock:
+            entry = self.commands.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def stats(self):
+        """Возвращает собранную статистику.
+
+        Returns:
+            dict: "calls" и "commands" — {имя: {"calls", "total", "mean"}} (время в секундах);
+            "nested" — {вызывающий: {вызываемый: {"calls", "per_call"}}}, где per_call —
+            среднее число вложенных вызовов на один вызов вызывающего метода.
+        """
+        with self._lock:
+            def summary(entries):
+                return {name: {"calls": count, "total": total, "mean": total / count if count else 0.0}
+                        for name, (count, total) in sorted(entries.items(), key=lambda item: -item[1][1])}
+
+            nested = {parent: {child: {"calls": count, "per_call": count / self.calls[parent][0]}
+                               for child, count in sorted(children.items())}
+                      for parent, children in sorted(self.nested.items()) if parent in self.calls}
+            return {"calls": summary(self.calls), "commands": summary(self.commands), "nested": nested}
+
+    def dump(self, path):
+        """Сохраняет статистику в файл JSON."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.stats(), file, ensure_ascii=False, indent=2)
+
+    def format_stats(self):
+        """Возвращает статистику в виде текстовой таблицы."""
+        stats = self.stats()
+        lines = []
+        for title, section in (("Вызовы", stats["calls"]), ("Команды", stats["commands"])):
+            if section:
+                lines.append(f"{title}:")
+                for name, entry in section.items():
+                    lines.append(f"  {name:<40} {entry['calls']:>9} {entry['total'] * 1000:>10.1f} мс "
+                                 f"{entry['mean'] * 1e6:>9.1f} мкс/вызов")
+        if stats["nested"]:
+            lines.append("Вложенные вызовы (в среднем на вызов):")
+            for parent, children in stats["nested"].items():
+                for child, entry in children.items():
+                    lines.append(f"  {parent} -> {child}: {entry['calls']} ({entry['per_call']:.2f})")
+        return "\n".join(lines) if lines else "Статистики нет."
+
+
+PROFILER = Profiler()
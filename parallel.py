@@ -0,0 +1,414 @@
+import argparse
+import multiprocessing
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from bitboard import create_board
+from compact import CompactPosition
+from engine import MATE_BOUND, Engine, SearchResult, format_result, format_score
+from fen import load_fen, iter_epd
+from perft import perft
+from transposition import TranspositionTable
+
+WORKER_TT_MB = 16
+BATCH_SIZE = 32
+CHECKED_LEVELS = 2
+
+_stop = None
+
+
+def _search_root_subset(position, moves, max_depth, time_limit, tt_mb):
+    """Задача процесса: поиск по части корневых ходов в позиции из CompactPosition.to_bytes.
+
+    Returns:
+        tuple: (список (глубина, оценка, from_pos, to_pos) по завершенным итерациям, число узлов).
+    """
+    board = CompactPosition.from_bytes(position).to_board()
+    iterations = []
+    engine = Engine(board, TranspositionTable(tt_mb))
+    result = engine.search(max_depth, time_limit, moves=set(moves),
+                           report=lambda result: iterations.append(
+                               (result.depth, result.score, result.move.from_pos, result.move.to_pos)))
+    return iterations, result.nodes
+
+
+def split_moves(moves, parts):
+    """Делит корневые ходы на parts частей по кругу, чтобы сильные ходы попали в разные части.
+
+    Args:
+        moves (list): Ходы в порядке убывания приоритета.
+        parts (int): Число частей.
+
+    Returns:
+        list: Непустые списки пар (from_pos, to_pos).
+    """
+    chunks = [[] for _ in range(parts)]
+    for index, move in enumerate(moves):
+        chunks[index % parts].append((move.from_pos, move.to_pos))
+    return [chunk for chunk in chunks if chunk]
+
+
+def parallel_analyze(board, workers=4, max_depth=64, time_limit=None, executor=None, tt_mb=WORKER_TT_MB):
+    """Ищет лучший ход, разделяя корневые ходы между процессами.
+
+    Позиция передается процессам в компактном виде (CompactPosition.to_bytes), а
+    не сериализацией объектов фигур. Каждый процесс ведет итеративное углубление
+    по своим ходам; результат берется с наибольшей глубины, завершенной всеми.
+    Процесс, нашедший мат, прекращает углубление раньше: его последняя оценка
+    точна и на большей глубине, поэтому глубину задают остальные процессы.
+
+    Args:
+        board (Board): Доска; позиция не меняется.
+        workers (int): Число процессов.
+        max_depth (int): Максимальная глубина в полуходах.
+        time_limit (float, optional): Ограничение времени в секундах.
+        executor (ProcessPoolExecutor, optional): Готовый пул процессов.
+        tt_mb (float): Размер таблицы позиций каждого процесса в МБ.
+
+    Returns:
+        SearchResult: Лучший ход (объект Move для board), оценка, глубина и суммарные узлы.
+    """
+    start = time.perf_counter()
+    engine = Engine(board, TranspositionTable(1))
+    root_moves = engine.order_moves(board.generate_legal_moves(board.turn), 0)
+    if not root_moves:
+        return engine.search(1)
+    position = CompactPosition.from_board(board).to_bytes()
+    chunks = split_moves(root_moves, workers)
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=len(chunks))
+    try:
+        futures = [executor.submit(_search_root_subset, position, chunk, max_depth, time_limit, tt_mb)
+                   for chunk in chunks]
+        outcomes = [future.result() for future in futures]
+    finally:
+        if own_executor:
+            executor.shutdown()
+    nodes = sum(worker_nodes for _, worker_nodes in outcomes)
+    finals = [iterations[-1] if iterations else None for iterations, _ in outcomes]
+    open_depths = [final[0] if final else 0 for final in finals if final is None or abs(final[1]) < MATE_BOUND]
+    depth = min(open_depths) if open_depths else max(final[0] for final in finals)
+    best = None
+    for (iterations, _), final in zip(outcomes, finals):
+        iteration = next((iteration for iteration in iterations if iteration[0] == depth), None)
+        if iteration is None and final is not None and final[0] < depth:
+            iteration = final
+        if iteration is not None and (best is None or iteration[1] > best[1]):
+            best = iteration
+    if best is None:
+        return SearchResult(root_moves[0], 0, 0, nodes, time.perf_counter() - start)
+    move = board.create_move(best[2], best[3])
+    return SearchResult(move, best[1], depth, nodes, time.perf_counter() - start)
+
+
+def _init_worker(stop):
+    # Процесс собственного пула: Ctrl+C обрабатывает только главный процесс,
+    # а о прерывании задачи узнают по общему флагу stop.
+    global _stop
+    _stop = stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _stopped():
+    return _stop is not None and _stop.is_set()
+
+
+def _create_executor(workers):
+    # Пул процессов и флаг, по которому его задачи прекращают работу досрочно.
+    stop = multiprocessing.Event()
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(stop,)), stop
+
+
+def _shutdown(executor, stop, interrupted):
+    # При отмене не ждем задач, которые уже считаются: они видят флаг и завершаются сами.
+    if interrupted:
+        stop.set()
+    executor.shutdown(wait=not interrupted, cancel_futures=True)
+
+
+def _perft_checked(board, depth, levels):
+    # perft, который на верхних levels уровнях проверяет флаг отмены; при отмене — None.
+    if levels == 0 or depth <= 1:
+        return perft(board, depth)
+    nodes = 0
+    for move in board.generate_legal_moves(board.turn):
+        if _stopped():
+            return None
+        board.make_move(move)
+        count = _perft_checked(board, depth - 1, levels - 1)
+        board.unmake_move()
+        if count is None:
+            return None
+        nodes += count
+    return nodes
+
+
+def _perft_task(position, depth):
+    """Задача процесса: perft позиции из CompactPosition.to_bytes (None, если подсчет прерван)."""
+    return _perft_checked(CompactPosition.from_bytes(position).to_board(), depth, CHECKED_LEVELS)
+
+
+def parallel_divide(board, depth, workers=4, executor=None, progress=None, cancel=None):
+    """Считает perft отдельно для каждого хода из корня, распределяя ходы по процессам.
+
+    Args:
+        board (Board): Доска; позиция не меняется.
+        depth (int): Глубина в полуходах (не меньше 1).
+        workers (int): Число процессов.
+        executor (ProcessPoolExecutor, optional): Готовый пул процессов.
+        progress (callable, optional): Вызывается с (готово, всего) после каждого хода.
+        cancel (threading.Event, optional): Если установлен, оставшиеся ходы не считаются, а
+            собственный пул прерывает и начатые; KeyboardInterrupt тоже устанавливает его.
+
+    Returns:
+        list: Пары (ход "E2 E4", число листьев) в порядке генерации ходов;
+        для не посчитанных из-за отмены ходов число равно None.
+    """
+    tasks = []
+    for move in board.generate_legal_moves(board.turn):
+        board.make_move(move)
+        tasks.append((str(move), CompactPosition.from_board(board).to_bytes()))
+        board.unmake_move()
+    counts = _run_ordered(_perft_task, [(position, depth - 1) for _, position in tasks],
+                          workers, executor, progress, cancel)
+    return [(name, count) for (name, _), count in zip(tasks, counts)]
+
+
+def parallel_perft(board, depth, workers=4, executor=None, progress=None, cancel=None):
+    """Считает perft, распределяя поддеревья ходов из корня по процессам.
+
+    Returns:
+        int or None: Число листьев или None, если подсчет был отменен.
+    """
+    if depth <= 1:
+        return perft(board, depth)
+    counts = [count for _, count in parallel_divide(board, depth, workers, executor, progress, cancel)]
+    return None if None in counts else sum(counts)
+
+
+def _run_ordered(function, arguments, workers, executor, progress, cancel):
+    own_executor = executor is None
+    if own_executor:
+        executor, stop = _create_executor(workers)
+    results = [None] * len(arguments)
+    pending = ()
+    try:
+        futures = {executor.submit(function, *args): index for index, args in enumerate(arguments)}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                if not future.cancelled():
+                    results[futures[future]] = future.result()
+            if progress and done:
+                progress(len(futures) - len(pending), len(futures))
+            if cancel is not None and cancel.is_set():
+                break
+    except KeyboardInterrupt:
+        if cancel is not None:
+            cancel.set()
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            _shutdown(executor, stop, bool(pending))
+    return results
+
+
+def _analyze_batch(task, depth, items):
+    """Задача процесса: анализ пакета позиций.
+
+    Args:
+        task (str): "perft" или "search".
+        depth (int): Глубина.
+        items (list): Тройки (номер строки, позиция в байтах, операции EPD).
+
+    Returns:
+        list: Пары (номер строки, словарь результата); если пул прерван — только для посчитанных позиций.
+    """
+    board = create_board()
+    results = []
+    for line_number, position, operations in items:
+        CompactPosition.from_bytes(position).to_board(board)
+        if _stopped():
+            break
+        if task == "perft":
+            nodes = _perft_checked(board, depth, CHECKED_LEVELS)
+            if nodes is None:
+                break
+            expected = operations.get(f"D{depth}")
+            results.append((line_number, {"nodes": nodes, "expected": int(expected) if expected else None,
+                                          "ok": expected is None or int(expected) == nodes}))
+        else:
+            result = Engine(board, TranspositionTable(1)).search(depth)
+            results.append((line_number, {"move": str(result.move) if result.move else None,
+                                          "score": result.score, "text": format_score(result)}))
+    return results
+
+
+def analyze_positions(source, task="perft", depth=3, workers=4, batch_size=BATCH_SIZE,
+                      executor=None, progress=None, cancel=None):
+    """Анализирует позиции из файла EPD пакетами на нескольких процессах.
+
+    Файл читается потоком, в работе одновременно не больше 2 * workers пакетов,
+    поэтому память не зависит от размера файла. Результаты выдаются в порядке
+    строк файла независимо от того, какой процесс закончил раньше.
+
+    Args:
+        source (str or file): Файл EPD (позиции и, для perft, операции D1, D2, ...).
+        task (str): "perft" — сверка perft с операцией D<depth>; "search" — лучший ход.
+        depth (int): Глубина.
+        workers (int): Число процессов.
+        batch_size (int): Позиций в одном пакете.
+        executor (ProcessPoolExecutor, optional): Готовый пул процессов.
+        progress (callable, optional): Вызывается с числом обработанных позиций.
+        cancel (threading.Event, optional): Если установлен, новые пакеты не отправляются, а
+            собственный пул прерывает и начатые.
+
+    Yields:
+        tuple: (номер строки, словарь результата).
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor, stop = _create_executor(workers)
+    in_flight = deque()
+    processed = 0
+    try:
+        batches = iter(_iter_batches(source, batch_size))
+        exhausted = False
+        while cancel is None or not cancel.is_set():
+            while not exhausted and len(in_flight) < 2 * workers:
+                batch = next(batches, None)
+                if batch is None:
+                    exhausted = True
+                else:
+                    in_flight.append(executor.submit(_analyze_batch, task, depth, batch))
+            if not in_flight:
+                break
+            done, _ = wait([in_flight[0]], timeout=0.1)
+            if not done:
+                continue
+            for item in in_flight.popleft().result():
+                processed += 1
+                yield item
+            if progress:
+                progress(processed)
+    finally:
+        for future in in_flight:
+            future.cancel()
+        if own_executor:
+            _shutdown(executor, stop, bool(in_flight))
+
+
+def _iter_batches(source, batch_size):
+    batch = []
+    for line_number, board, operations in iter_epd(source):
+        batch.append((line_number, CompactPosition.from_board(board).to_bytes(), operations))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def benchmark(board, depth, worker_counts=(1, 2, 4, 8), report=print):
+    """Замеряет время до глубины depth при разном числе процессов.
+
+    Args:
+        board (Board): Доска.
+        depth (int): Глубина поиска в полуходах.
+        worker_counts (tuple): Числа процессов для замера.
+        report (callable): Функция вывода строки отчета.
+
+    Returns:
+        list: Список (число процессов, время в секундах, ускорение относительно первого замера).
+    """
+    results = []
+    base = None
+    for workers in worker_counts:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Прогрев: процессы запускаются и импортируют модули до замера.
+            list(executor.map(abs, range(workers)))
+            start = time.perf_counter()
+            result = parallel_analyze(board, workers, depth, executor=executor)
+            elapsed = time.perf_counter() - start
+        base = base or elapsed
+        results.append((workers, elapsed, base / elapsed))
+        report(f"процессов {workers}: {elapsed:.3f} c, ускорение {base / elapsed:.2f}x, "
+               f"ход {result.move}, оценка {result.score}, узлов {result.nodes}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Параллельный поиск, perft и анализ наборов позиций.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    search = subparsers.add_parser("search", help="поиск лучшего хода или замер ускорения")
+    search.add_argument("--fen", help="позиция в FEN (по умолчанию — начальная)")
+    search.add_argument("--version", type=int, choices=(1, 2), default=1, help="вариант начальной расстановки")
+    search.add_argument("--depth", type=int, default=4, help="глубина поиска")
+    search.add_argument("--time", type=float, help="ограничение времени в секундах (вместо замера)")
+    search.add_argument("--workers", default="1,2,4,8", help="числа процессов через запятую")
+    divide = subparsers.add_parser("perft", help="perft с разбивкой по ходам из корня")
+    divide.add_argument("--fen", help="позиция в FEN (по умолчанию — начальная)")
+    divide.add_argument("--version", type=int, choices=(1, 2), default=1, help="вариант начальной расстановки")
+    divide.add_argument("--depth", type=int, default=4, help="глубина")
+    divide.add_argument("--workers", type=int, default=4, help="число процессов")
+    epd = subparsers.add_parser("epd", help="анализ позиций из файла EPD")
+    epd.add_argument("path", help="файл EPD")
+    epd.add_argument("--task", choices=("perft", "search"), default="perft", help="что считать")
+    epd.add_argument("--depth", type=int, default=3, help="глубина")
+    epd.add_argument("--workers", type=int, default=4, help="число процессов")
+    args = parser.parse_args()
+
+    if args.command == "epd":
+        _run_epd(args)
+        return
+    board = create_board()
+    if args.fen:
+        load_fen(board, args.fen)
+    else:
+        board.setup_initial_position(args.version)
+    if args.command == "perft":
+        start = time.perf_counter()
+        try:
+            results = parallel_divide(board, args.depth, args.workers,
+                                      progress=lambda done, total: print(f"\r{done}/{total}", end="", flush=True))
+        except KeyboardInterrupt:
+            print()
+            raise SystemExit(1)
+        elapsed = time.perf_counter() - start
+        print()
+        for move, nodes in results:
+            print(f"{move}: {nodes}")
+        total = sum(nodes for _, nodes in results)
+        print(f"\nХодов: {len(results)}, узлов: {total}, {elapsed:.3f} c, {total / elapsed if elapsed else 0:.0f} узл/с")
+        return
+    worker_counts = tuple(int(count) for count in args.workers.split(","))
+    if args.time:
+        result = parallel_analyze(board, worker_counts[-1], args.depth, args.time)
+        print(format_result(result))
+        return
+    benchmark(board, args.depth, worker_counts)
+
+
+def _run_epd(args):
+    failed = 0
+    try:
+        for line_number, result in analyze_positions(args.path, args.task, args.depth, args.workers):
+            if args.task == "perft":
+                failed += not result["ok"]
+                status = "OK" if result["ok"] else f"ОШИБКА, ожидалось {result['expected']}"
+                print(f"строка {line_number}: {result['nodes']} {status}")
+            else:
+                print(f"строка {line_number}: {result['move']} {result['text']}")
+    except KeyboardInterrupt:
+        raise SystemExit(1)
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import argparse
+import time
+
+from bitboard import create_board, BACKENDS
+from board import parse_square
+from fen import load_fen
+
+PERFT_POSITIONS = {
+    "start-classic": {
+        "version": 1,
+        "moves": [],
+        "reference": {1: 20, 2: 400, 3: 8902, 4: 197281},
+    },
+    "start-variant": {
+        "version": 2,
+        "moves": [],
+        "reference": {1: 30, 2: 858, 3: 25716, 4: 747537},
+    },
+    "castling": {
+        "version": 1,
+        "moves": ["E2 E4", "E7 E5", "G1 F3", "B8 C6", "F1 C4", "G8 F6"],
+        "reference": {1: 33, 2: 930, 3: 30542},
+    },
+    "en-passant": {
+        "version": 1,
+        "moves": ["E2 E4", "A7 A6", "E4 E5", "D7 D5"],
+        "reference": {1: 31, 2: 781, 3: 24166},
+    },
+    "promotion": {
+        "version": 1,
+        "moves": ["A2 A4", "B7 B5", "A4 B5", "A7 A6", "B5 A6", "E7 E6", "A6 A7", "F8 C5"],
+        "reference": {1: 24, 2: 819, 3: 21189},
+    },
+    "variant-open": {
+        "version": 2,
+        "moves": ["E2 E4", "E7 E5", "B1 D3", "G8 E6"],
+        "reference": {1: 39, 2: 1549, 3: 59493},
+    },
+    "variant-promotion": {
+        "version": 2,
+        "moves": ["H2 H4", "G7 G5", "H4 G5", "H7 H6", "G5 H6", "E7 E6", "H6 H7", "A7 A6"],
+        "reference": {1: 29, 2: 747, 3: 22399},
+    },
+    "double-check": {
+        "fen": "5dm1/cp3kP1/2Q2m2/1P1p2dp/3PP3/PMP1MP2/8/2DK2qc w - - 0 41",
+        "reference": {1: 5, 2: 239, 3: 7310},
+    },
+}
+
+
+def perft(board, depth):
+    """Считает число листьев дерева легальных ходов заданной глубины.
+
+    Ходы выполняются и отменяются через make_move/unmake_move — те же примитивы,
+    на которых построены move_piece и undo_last_move.
+
+    Args:
+        board (Board): Доска; после подсчета позиция остается прежней.
+        depth (int): Глубина в полуходах.
+
+    Returns:
+        int: Количество позиций на глубине depth.
+    """
+    if depth == 0:
+        return 1
+    moves = board.generate_legal_moves(board.turn)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        board.make_move(move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board, depth):
+    """Считает perft отдельно для каждого хода из корня.
+
+    Args:
+        board (Board): Доска.
+        depth (int): Глубина в полуходах (не меньше 1).
+
+    Returns:
+        list: Список пар (ход в формате "E2 E4", число листьев).
+    """
+    results = []
+    for move in board.generate_legal_moves(board.turn):
+        board.make_move(move)
+        results.append((str(move), perft(board, depth - 1)))
+        board.unmake_move()
+    return results
+
+
+def setup_position(name, backend="grid"):
+    """Создает доску с позицией из набора PERFT_POSITIONS.
+
+    Позиция задается строкой FEN ("fen") или вариантом расстановки и ходами
+    от начальной позиции ("version" и "moves").
+
+    Args:
+        name (str): Имя позиции.
+        backend (str): Тип доски ("grid" или "bitboard").
+
+    Returns:
+        Board: Доска с расставленной позицией.
+    """
+    spec = PERFT_POSITIONS[name]
+    board = create_board(backend)
+    if "fen" in spec:
+        return load_fen(board, spec["fen"])
+    board.setup_initial_position(spec["version"])
+    for move in spec["moves"]:
+        from_pos, to_pos = (parse_square(square) for square in move.split())
+        if not board.move_piece(from_pos, to_pos):
+            raise ValueError(f"Недопустимый ход {move} в позиции {name}")
+    return board
+
+
+def run_suite(max_depth, backend="grid", names=None, report=print):
+    """Прогоняет perft по набору позиций и сверяет результат с эталонными числами.
+
+    Args:
+        max_depth (int): Максимальная глубина.
+        backend (str): Тип доски ("grid" или "bitboard").
+        names (list, optional): Имена позиций; по умолчанию все.
+        report (callable): Функция вывода строки отчета.
+
+    Returns:
+        bool: True, если все числа совпали с эталоном.
+    """
+    all_ok = True
+    total_nodes = 0
+    total_time = 0.0
+    for name in names or PERFT_POSITIONS:
+        reference = PERFT_POSITIONS[name]["reference"]
+        board = setup_position(name, backend)
+        for depth in sorted(reference):
+            if depth > max_depth:
+                break
+            start = time.perf_counter()
+            nodes = perft(board, depth)
+            elapsed = time.perf_counter() - start
+            total_nodes += nodes
+            total_time += elapsed
+            ok = nodes == reference[depth]
+            all_ok = all_ok and ok
+            report(f"{name:18} depth {depth}: {nodes:>9} "
+                   f"{'OK' if ok else 'ОШИБКА, ожидалось ' + str(reference[depth])}"
+                   f"  {elapsed:8.3f} c  {nodes / elapsed if elapsed else 0:10.0f} узл/с")
+    report(f"Итого: {total_nodes} узлов за {total_time:.3f} c, "
+           f"{total_nodes / total_time if total_time else 0:.0f} узл/с")
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft: подсчет дерева ходов и замер скорости генерации ходов.")
+    parser.add_argument("--position", choices=list(PERFT_POSITIONS), help="позиция из набора (по умолчанию — весь набор)")
+    parser.add_argument("--depth", type=int, default=3, help="глубина в полуходах")
+    parser.add_argument("--divide", action="store_true", help="вывести разбивку по ходам из корня")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="grid", help="тип доски")
+    args = parser.parse_args()
+
+    if args.position and args.divide:
+        board = setup_position(args.position, args.backend)
+        start = time.perf_counter()
+        results = divide(board, args.depth)
+        elapsed = time.perf_counter() - start
+        for move, nodes in results:
+            print(f"{move}: {nodes}")
+        total = sum(nodes for _, nodes in results)
+        print(f"\nХодов: {len(results)}, узлов: {total}, {elapsed:.3f} c, "
+              f"{total / elapsed if elapsed else 0:.0f} узл/с")
+        return
+    names = [args.position] if args.position else None
+    ok = run_suite(args.depth, args.backend, names)
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
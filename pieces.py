@@ -1,56 +1,190 @@
+def _build_leap_table(offsets_for):
+    """Строит таблицу прыжков: для каждой клетки — кортеж достижимых клеток внутри доски.
+
+    Args:
+        offsets_for (callable): Функция (row, col) -> смещения (dr, dc) для этой клетки.
+
+    Returns:
+        dict: Словарь {(row, col): ((row, col), ...)}.
+    """
+    table = {}
+    for row in range(8):
+        for col in range(8):
+            table[(row, col)] = tuple(
+                (row + dr, col + dc) for dr, dc in offsets_for(row, col)
+                if 0 <= row + dr < 8 and 0 <= col + dc < 8
+            )
+    return table
+
+
+def _build_ray_table(directions_for):
+    """Строит таблицу лучей: для каждой клетки — кортеж лучей до края доски.
+
+    Args:
+        directions_for (callable): Функция (row, col) -> направления (dr, dc) для этой клетки.
+
+    Returns:
+        dict: Словарь {(row, col): (луч, ...)}, где луч — кортеж клеток по порядку удаления.
+    """
+    table = {}
+    for row in range(8):
+        for col in range(8):
+            rays = []
+            for dr, dc in directions_for(row, col):
+                ray = []
+                new_row, new_col = row + dr, col + dc
+                while 0 <= new_row < 8 and 0 <= new_col < 8:
+                    ray.append((new_row, new_col))
+                    new_row, new_col = new_row + dr, new_col + dc
+                if ray:
+                    rays.append(tuple(ray))
+            table[(row, col)] = tuple(rays)
+    return table
+
+
+KING_OFFSETS = ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
 class Piece:
     """Базовый класс для всех шахматных фигур.
 
+    Геометрия ходов задается атрибутами класса offsets (прыжки) и directions (лучи).
+    При объявлении подкласса по ним один раз строятся таблицы leap_table и ray_table
+    для всех 64 клеток, так что при генерации ходов границы доски не проверяются.
+
     Args:
         color (str): Цвет фигуры ("white" или "black").
         symbol (str): Символ фигуры для отображения на доске (например, "P" для пешки).
     """
-    
+
+    __slots__ = ("color", "symbol", "position")
+
+    offsets = ()
+    directions = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.leap_table = _build_leap_table(cls.get_offsets)
+        cls.ray_table = _build_ray_table(cls.get_directions)
+
     def __init__(self, color, symbol):
         self.color = color
         self.symbol = symbol
         self.position = None
-        
+
+    @classmethod
+    def get_offsets(cls, row, col):
+        """Возвращает смещения прыжков фигуры с клетки (row, col)."""
+        return cls.offsets
+
+    @classmethod
+    def get_directions(cls, row, col):
+        """Возвращает направления лучей фигуры с клетки (row, col)."""
+        return cls.directions
+
     def get_valid_moves(self, board):
-        return []
-    
-    def _get_moves_in_directions(self, board, directions, max_steps=8):
+        return self._get_leap_moves(board) + self._get_ray_moves(board)
+
+    def get_attacks(self, board):
+        """Возвращает список клеток, которые фигура атакует.
+
+        В отличие от get_valid_moves, сюда входят клетки со своими фигурами
+        (защищаемые), а ходы короля не проверяются на шах. Для фигур со своими
+        правилами хода по умолчанию используются их допустимые ходы.
+
+        Args:
+            board (Board): Объект доски, на которой находится фигура.
+
+        Returns:
+            list: Список кортежей (row, col) — атакуемые клетки.
+        """
+        if type(self).get_valid_moves is Piece.get_valid_moves:
+            return list(self.leap_table[self.position]) + self._get_ray_attacks(board)
+        return self.get_valid_moves(board)
+
+    def get_attack_watch(self, board, attacks):
+        """Возвращает клетки, от занятости которых зависят атаки фигуры.
+
+        Доска пересчитывает атаки фигуры, только когда меняется одна из этих клеток.
+
+        Args:
+            board (Board): Объект доски, на которой находится фигура.
+            attacks (list): Атаки фигуры, полученные из get_attacks.
+
+        Returns:
+            list or None: Список клеток или None, если атаки зависят от всей доски.
+        """
+        if type(self).get_valid_moves is Piece.get_valid_moves:
+            return attacks
+        return None
+
+    def _get_leap_moves(self, board):
+        grid = board.grid
+        color = self.color
         moves = []
-        row, col = self.position
-        for dr, dc in directions:
-            for i in range(1, max_steps + 1):
-                new_row, new_col = row + i * dr, col + i * dc
-                if 0 <= new_row < 8 and 0 <= new_col < 8:
-                    if board.is_empty(new_row, new_col):
-                        moves.append((new_row, new_col))
-                    else:
-                        if board.get_piece(new_row, new_col).color != self.color:
-                            moves.append((new_row, new_col))
-                        break
+        for target in self.leap_table[self.position]:
+            piece = grid[target[0]][target[1]]
+            if piece is None or piece.color != color:
+                moves.append(target)
+        return moves
+
+    def _get_ray_moves(self, board):
+        grid = board.grid
+        color = self.color
+        moves = []
+        for ray in self.ray_table[self.position]:
+            for target in ray:
+                piece = grid[target[0]][target[1]]
+                if piece is None:
+                    moves.append(target)
                 else:
+                    if piece.color != color:
+                        moves.append(target)
                     break
         return moves
-    
+
+    def _get_ray_attacks(self, board):
+        grid = board.grid
+        attacks = []
+        for ray in self.ray_table[self.position]:
+            for target in ray:
+                attacks.append(target)
+                if grid[target[0]][target[1]] is not None:
+                    break
+        return attacks
+
     def __str__(self):
         """Возвращает строковое представление фигуры.
 
         Returns:
             str: Символ фигуры (например, "P" или "p").
         """
-        
+
         return self.symbol
 
+
+Piece.leap_table = _build_leap_table(Piece.get_offsets)
+Piece.ray_table = _build_ray_table(Piece.get_directions)
+
+
 class Pawn(Piece):
     """Класс пешки, наследуется от Piece.
 
     Args:
         color (str): Цвет пешки ("white" или "black").
     """
-    
+
+    __slots__ = ("has_moved",)
+
+    capture_table = {
+        "white": _build_leap_table(lambda row, col: ((1, -1), (1, 1))),
+        "black": _build_leap_table(lambda row, col: ((-1, -1), (-1, 1))),
+    }
+
     def __init__(self, color):
         super().__init__(color, "P" if color == "white" else "p")
         self.has_moved = False
-        
+
     def get_valid_moves(self, board):
         """Возвращает список допустимых ходов для пешки.
 
@@ -60,39 +194,63 @@ class Pawn(Piece):
         Returns:
             list: Список кортежей (row, col) — допустимые позиции для хода.
         """
-        
+
         moves = []
+        grid = board.grid
         row, col = self.position
         direction = 1 if self.color == "white" else -1
         new_row = row + direction
-        if 0 <= new_row < 8 and board.is_empty(new_row, col):
+        if 0 <= new_row < 8 and grid[new_row][col] is None:
             moves.append((new_row, col))
-            if not self.has_moved and board.is_empty(row + 2*direction, col):
+            if not self.has_moved and 0 <= row + 2*direction < 8 and grid[row + 2*direction][col] is None:
                 moves.append((row + 2*direction, col))
-        for dc in [-1, 1]:
-            new_col = col + dc
-            if (0 <= new_col < 8 and 0 <= new_row < 8 and 
-                not board.is_empty(new_row, new_col) and 
-                board.get_piece(new_row, new_col).color != self.color):
-                moves.append((new_row, new_col))
+        for target in self.capture_table[self.color][self.position]:
+            piece = grid[target[0]][target[1]]
+            if piece is not None and piece.color != self.color:
+                moves.append(target)
+        moves.extend(self._get_en_passant_moves(board))
+        return moves
+
+    def _get_en_passant_moves(self, board):
+        moves = []
+        row, col = self.position
+        direction = 1 if self.color == "white" else -1
         if (self.color == "white" and row == 4) or (self.color == "black" and row == 3):
-            last_move = board.move_history[-1] if board.move_history else None
-            if (last_move and isinstance(last_move.piece, Pawn) and 
-                abs(last_move.from_pos[0] - last_move.to_pos[0]) == 2):
-                moves.append((row + direction, last_move.to_pos[1]))
+            target = board.get_en_passant_target()
+            if target and target[0] == row + direction and abs(target[1] - col) == 1:
+                moves.append(target)
         return moves
 
+    def get_attacks(self, board):
+        """Возвращает клетки, которые пешка бьёт по диагонали.
+
+        Args:
+            board (Board): Объект доски, на которой находится пешка.
+
+        Returns:
+            list: Список кортежей (row, col) — атакуемые клетки.
+        """
+        return self.capture_table[self.color][self.position]
+
+    def get_attack_watch(self, board, attacks):
+        """Атаки не зависят от доски."""
+        return []
+
 class Rook(Piece):
     """Класс ладьи, наследуется от Piece.
 
     Args:
         color (str): Цвет ладьи ("white" или "black").
     """
-    
+
+    __slots__ = ("has_moved",)
+
+    directions = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
     def __init__(self, color):
         super().__init__(color, "R" if color == "white" else "r")
         self.has_moved = False
-        
+
     def get_valid_moves(self, board):
         """Возвращает список допустимых ходов для ладьи.
 
@@ -102,9 +260,23 @@ class Rook(Piece):
         Returns:
             list: Список кортежей (row, col) — допустимые позиции для хода.
         """
-        
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        return self._get_moves_in_directions(board, directions)
+
+        return self._get_ray_moves(board)
+
+    def get_attacks(self, board):
+        """Возвращает клетки, которые атакует ладья (до первой фигуры на каждой линии).
+
+        Args:
+            board (Board): Объект доски, на которой находится ладья.
+
+        Returns:
+            list: Список кортежей (row, col) — атакуемые клетки.
+        """
+        return self._get_ray_attacks(board)
+
+    def get_attack_watch(self, board, attacks):
+        """Следит только за атакуемыми клетками."""
+        return attacks
 
 class Knight(Piece):
     """Класс коня, наследуется от Piece.
@@ -112,10 +284,14 @@ class Knight(Piece):
     Args:
         color (str): Цвет коня ("white" или "black").
     """
-    
+
+    __slots__ = ()
+
+    offsets = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+
     def __init__(self, color):
         super().__init__(color, "N" if color == "white" else "n")
-        
+
     def get_valid_moves(self, board):
         """Возвращает список допустимых ходов для коня.
 
@@ -125,15 +301,22 @@ class Knight(Piece):
         Returns:
             list: Список кортежей (row, col) — допустимые позиции для хода.
         """
-        moves = []
-        row, col = self.position
-        knight_moves = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
-        for dr, dc in knight_moves:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < 8 and 0 <= new_col < 8:
-                if board.is_empty(new_row, new_col) or board.get_piece(new_row, new_col).color != self.color:
-                    moves.append((new_row, new_col))
-        return moves
+        return self._get_leap_moves(board)
+
+    def get_attacks(self, board):
+        """Возвращает клетки, которые атакует конь.
+
+        Args:
+            board (Board): Объект доски, на которой находится конь.
+
+        Returns:
+            list: Список кортежей (row, col) — атакуемые клетки.
+        """
+        return self.leap_table[self.position]
+
+    def get_attack_watch(self, board, attacks):
+        """Атаки не зависят от доски."""
+        return []
 
 class Bishop(Piece):
     """Класс слона, наследуется от Piece.
@@ -141,10 +324,14 @@ class Bishop(Piece):
     Args:
         color (str): Цвет слона ("white" или "black").
     """
-    
+
+    __slots__ = ()
+
+    directions = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
     def __init__(self, color):
         super().__init__(color, "B" if color == "white" else "b")
-        
+
     def get_valid_moves(self, board):
         """Возвращает список допустимых ходов для слона.
 
@@ -154,9 +341,23 @@ class Bishop(Piece):
         Returns:
             list: Список кортежей (row, col) — допустимые позиции для хода.
         """
-        
-        directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-        return self._get_moves_in_directions(board, directions)
+
+        return self._get_ray_moves(board)
+
+    def get_attacks(self, board):
+        """Возвращает клетки, которые атакует слон (до первой фигуры на каждой диагонали).
+
+        Args:
+            board (Board): Объект доски, на которой находится слон.
+
+        Returns:
+            list: Список кортежей (row, col) — атакуемые клетки.
+        """
+        return self._get_ray_attacks(board)
+
+    def get_attack_watch(self, board, attacks):
+        """Следит только за атакуемыми клетками."""
+        return attacks
 
 class Queen(Piece):
     """Класс ферзя, наследуется от Piece.
@@ -164,10 +365,14 @@ class Queen(Piece):
     Args:
         color (str): Цвет ферзя ("white" или "black").
     """
-    
+
+    __slots__ = ()
+
+    directions = ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
     def __init__(self, color):
         super().__init__(color, "Q" if color == "white" else "q")
-        
+
     def get_valid_moves(self, board):
         """Возвращает список допустимых ходов для ферзя (комбинация ладьи и слона).
 
@@ -177,9 +382,23 @@ class Queen(Piece):
         Returns:
             list: Список кортежей (row, col) — допустимые позиции для хода.
         """
-        
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
-        return self._get_moves_in_directions(board, directions)
+
+        return self._get_ray_moves(board)
+
+    def get_attacks(self, board):
+        """Возвращает клетки, которые атакует ферзь.
+
+        Args:
+            board (Board): Объект доски, на которой находится ферзь.
+
+        Returns:
+            list: Список кортежей (row, col) — атакуемые клетки.
+        """
+        return self._get_ray_attacks(board)
+
+    def get_attack_watch(self, board, attacks):
+        """Следит только за атакуемыми клетками."""
+        return attacks
 
 class King(Piece):
     """Класс короля, наследуется от Piece.
@@ -187,11 +406,15 @@ class King(Piece):
     Args:
         color (str): Цвет короля ("white" или "black").
     """
-    
+
+    __slots__ = ("has_moved",)
+
+    offsets = KING_OFFSETS
+
     def __init__(self, color):
         super().__init__(color, "K" if color == "white" else "k")
         self.has_moved = False
-        
+
     def get_valid_moves(self, board, check_castling=True):
         """Возвращает список допустимых ходов для короля, включая рокировку.
 
@@ -201,26 +424,28 @@ class King(Piece):
         Returns:
             list: Список кортежей (row, col) — допустимые позиции для хода.
         """
-        
+
         moves = []
         row, col = self.position
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < 8 and 0 <= new_col < 8:
-                if board.is_empty(new_row, new_col) or board.get_piece(new_row, new_col).color != self.color:
-                    original_piece = board.get_piece(new_row, new_col)
-                    board.grid[new_row][new_col] = self
-                    board.grid[row][col] = None
-                    temp_pos = self.position
-                    self.position = (new_row, new_col)
-                    in_check = board.is_in_check(self.color)
-                    board.grid[row][col] = self
-                    board.grid[new_row][new_col] = original_piece
-                    self.position = temp_pos
-                    if not in_check:
-                        moves.append((new_row, new_col))
-        if check_castling and not self.has_moved and not board.is_in_check(self.color):
+        for new_row, new_col in self._get_leap_moves(board):
+            original_piece = board.remove_piece(new_row, new_col)
+            board.remove_piece(row, col)
+            board.place_piece(self, new_row, new_col)
+            in_check = board.is_in_check(self.color)
+            board.remove_piece(new_row, new_col)
+            board.place_piece(self, row, col)
+            if original_piece:
+                board.place_piece(original_piece, new_row, new_col)
+            if not in_check:
+                moves.append((new_row, new_col))
+        if check_castling:
+            moves.extend(self._get_castling_moves(board))
+        return moves
+
+    def _get_castling_moves(self, board):
+        moves = []
+        row, col = self.position
+        if not self.has_moved and not board.is_in_check(self.color):
             if (col == 4 and board.is_empty(row, 5) and board.is_empty(row, 6) and
                 isinstance(board.get_piece(row, 7), Rook) and not board.get_piece(row, 7).has_moved):
                 if not board.is_square_attacked(self.color, (row, 5)) and not board.is_square_attacked(self.color, (row, 6)):
@@ -231,16 +456,35 @@ class King(Piece):
                     moves.append((row, 2))
         return moves
 
+    def get_attacks(self, board):
+        """Возвращает соседние клетки, которые атакует король (без проверки шаха).
+
+        Args:
+            board (Board): Объект доски, на которой находится король.
+
+        Returns:
+            list: Список кортежей (row, col) — атакуемые клетки.
+        """
+        return self.leap_table[self.position]
+
+    def get_attack_watch(self, board, attacks):
+        """Атаки не зависят от доски."""
+        return []
+
 class Rabbit(Piece):
     """Класс кролика (новая фигура), наследуется от Piece.
 
     Args:
         color (str): Цвет кролика ("white" или "black").
     """
-    
+
+    __slots__ = ()
+
+    offsets = ((2, 0), (-2, 0), (0, 2), (0, -2), (2, 2), (2, -2), (-2, 2), (-2, -2))
+
     def __init__(self, color):
         super().__init__(color, "M" if color == "white" else "m")
-        
+
     def get_valid_moves(self, board):
         """Возвращает список допустимых ходов для кролика (как конь, но только вперед).
 
@@ -250,16 +494,23 @@ class Rabbit(Piece):
         Returns:
             list: Список кортежей (row, col) — допустимые позиции для хода.
         """
-        
-        moves = []
-        row, col = self.position
-        directions = [(2, 0), (-2, 0), (0, 2), (0, -2), (2, 2), (2, -2), (-2, 2), (-2, -2)]
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < 8 and 0 <= new_col < 8:
-                if board.is_empty(new_row, new_col) or board.get_piece(new_row, new_col).color != self.color:
-                    moves.append((new_row, new_col))
-        return moves
+
+        return self._get_leap_moves(board)
+
+    def get_attacks(self, board):
+        """Возвращает клетки, которые атакует кролик.
+
+        Args:
+            board (Board): Объект доски, на которой находится кролик.
+
+        Returns:
+            list: Список кортежей (row, col) — атакуемые клетки.
+        """
+        return self.leap_table[self.position]
+
+    def get_attack_watch(self, board, attacks):
+        """Атаки не зависят от доски."""
+        return []
 
 class Dog(Piece):
     """Класс собаки (новая фигура), наследуется от Piece.
@@ -267,10 +518,14 @@ class Dog(Piece):
     Args:
         color (str): Цвет собаки ("white" или "black").
     """
-    
+
+    __slots__ = ()
+
+    offsets = KING_OFFSETS
+
     def __init__(self, color):
         super().__init__(color, "D" if color == "white" else "d")
-        
+
     def get_valid_moves(self, board):
         """Возвращает список допустимых ходов для собаки (вперед на 1 или диагональ назад).
 
@@ -280,27 +535,34 @@ class Dog(Piece):
         Returns:
             list: Список кортежей (row, col) — допустимые позиции для хода.
         """
-        
-        moves = []
-        row, col = self.position
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
-        has_neighbor = False
-        for dr in range(-1, 2):
-            for dc in range(-1, 2):
-                if (dr, dc) != (0, 0):
-                    new_row, new_col = row + dr, col + dc
-                    if 0 <= new_row < 8 and 0 <= new_col < 8 and not board.is_empty(new_row, new_col):
-                        has_neighbor = True
-                        break
-            if has_neighbor:
-                break
-        if has_neighbor:
-            for dr, dc in directions:
-                new_row, new_col = row + dr, col + dc
-                if 0 <= new_row < 8 and 0 <= new_col < 8:
-                    if board.is_empty(new_row, new_col) or board.get_piece(new_row, new_col).color != self.color:
-                        moves.append((new_row, new_col))
-        return moves
+
+        if not self._has_neighbor(board):
+            return []
+        return self._get_leap_moves(board)
+
+    def _has_neighbor(self, board):
+        grid = board.grid
+        for row, col in self.leap_table[self.position]:
+            if grid[row][col] is not None:
+                return True
+        return False
+
+    def get_attacks(self, board):
+        """Возвращает соседние клетки, которые атакует собака, если рядом есть хоть одна фигура.
+
+        Args:
+            board (Board): Объект доски, на которой находится собака.
+
+        Returns:
+            list: Список кортежей (row, col) — атакуемые клетки.
+        """
+        if self._has_neighbor(board):
+            return self.leap_table[self.position]
+        return []
+
+    def get_attack_watch(self, board, attacks):
+        """Следит за всеми соседними клетками."""
+        return self.leap_table[self.position]
 
 class Cat(Piece):
     """Класс кота (новая фигура), наследуется от Piece.
@@ -308,10 +570,22 @@ class Cat(Piece):
     Args:
         color (str): Цвет кота ("white" или "black").
     """
-    
+
+    __slots__ = ()
+
     def __init__(self, color):
         super().__init__(color, "C" if color == "white" else "c")
-        
+
+    @classmethod
+    def get_directions(cls, row, col):
+        """Возвращает направления вдоль края доски, по которым может идти кот с клетки (row, col)."""
+        directions = []
+        if row in [0, 7]:
+            directions.extend([(0, 1), (0, -1)])
+        if col in [0, 7]:
+            directions.extend([(1, 0), (-1, 0)])
+        return directions
+
     def get_valid_moves(self, board):
         """Возвращает список допустимых ходов для кота (как король, но без рокировки).
 
@@ -321,49 +595,43 @@ class Cat(Piece):
         Returns:
             list: Список кортежей (row, col) — допустимые позиции для хода.
         """
-        
+
         moves = []
-        row, col = self.position
-        if row in [0, 7]:
-            for new_col in range(col + 1, 8):
-                piece = board.get_piece(row, new_col)
+        grid = board.grid
+        for ray in self.ray_table[self.position]:
+            for target in ray:
+                piece = grid[target[0]][target[1]]
                 if piece:
                     if piece.color == self.color:
                         continue
                     else:
-                        moves.append((row, new_col))
+                        moves.append(target)
                         break
                 else:
-                    moves.append((row, new_col))
-            for new_col in range(col - 1, -1, -1):
-                piece = board.get_piece(row, new_col)
-                if piece:
-                    if piece.color == self.color:
-                        continue
-                    else:
-                        moves.append((row, new_col))
-                        break
-                else:
-                    moves.append((row, new_col))
-        if col in [0, 7]:
-            for new_row in range(row + 1, 8):
-                piece = board.get_piece(new_row, col)
-                if piece:
-                    if piece.color == self.color:
-                        continue
-                    else:
-                        moves.append((new_row, col))
-                        break
-                else:
-                    moves.append((new_row, col))
-            for new_row in range(row - 1, -1, -1):
-                piece = board.get_piece(new_row, col)
-                if piece:
-                    if piece.color == self.color:
-                        continue
-                    else:
-                        moves.append((new_row, col))
-                        break
-                else:
-                    moves.append((new_row, col))
-        return moves
\ No newline at end of file
+                    moves.append(target)
+        return moves
+
+    def get_attacks(self, board):
+        """Возвращает клетки, которые атакует кот вдоль края доски.
+
+        Свои фигуры кот перепрыгивает и защищает, на первой фигуре соперника останавливается.
+
+        Args:
+            board (Board): Объект доски, на которой находится кот.
+
+        Returns:
+            list: Список кортежей (row, col) — атакуемые клетки.
+        """
+        attacks = []
+        grid = board.grid
+        for ray in self.ray_table[self.position]:
+            for target in ray:
+                attacks.append(target)
+                piece = grid[target[0]][target[1]]
+                if piece and piece.color != self.color:
+                    break
+        return attacks
+
+    def get_attack_watch(self, board, attacks):
+        """Следит только за атакуемыми клетками."""
+        return attacks
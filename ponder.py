@@ -0,0 +1,70 @@
+import threading
+
+from board import PositionInfo
+from compact import CompactPosition
+
+
+class Ponderer:
+    """Фоновый расчет сведений о позиции, пока консоль ждет ввода.
+
+    start делает компактный снимок текущей позиции и запускает поток, который
+    на своей копии доски считает PositionInfo для ходящего игрока (легальные
+    ходы, шах, мат, угрозы), а затем для позиций после каждого его хода
+    (ответы соперника и проверка мата после хода). Результаты кладутся в кэш
+    основной доски по ключу позиции Board.hash, поэтому сведения о другой
+    позиции никогда не будут использованы вместо текущей.
+
+    stop прерывает поток и дожидается его, после чего основной доской снова
+    пользуется только вызывающий поток. Вызывайте stop перед любой работой с
+    доской.
+
+    Args:
+        board (Board): Основная доска партии.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.published = 0
+        self._thread = None
+        self._cancel = threading.Event()
+
+    def start(self):
+        """Начинает расчет для текущей позиции доски, прерывая предыдущий."""
+        self.stop()
+        board = self.board
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        args=(CompactPosition.from_board(board), board.hash, type(board), self._cancel))
+        self._thread.start()
+
+    def stop(self):
+        """Прерывает расчет и ждет завершения потока."""
+        if self._thread is not None:
+            self._cancel.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, position, key, board_class, cancel):
+        copy = position.to_board(board_class())
+        if copy.hash != key:
+            return
+        info = PositionInfo(copy)
+        if not self._publish(key, info, cancel):
+            return
+        for from_pos, targets in info.moves.items():
+            for to_pos in targets:
+                if cancel.is_set():
+                    return
+                copy.make_move(copy.create_move(from_pos, to_pos))
+                child_key = copy.hash
+                child = None if self.board.has_position_info(child_key) else PositionInfo(copy)
+                copy.unmake_move()
+                if child is not None and not self._publish(child_key, child, cancel):
+                    return
+
+    def _publish(self, key, info, cancel):
+        if cancel.is_set():
+            return False
+        self.board.publish_position_info(key, info)
+        self.published += 1
+        return True
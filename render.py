@@ -0,0 +1,122 @@
+import sys
+
+FILES = "   A  B  C  D  E  F  G  H"
+CELL_WIDTH = 3
+BOARD_TOP = 2
+CELL_LEFT = 3
+FOOTER_LINE = 13
+PROMPT_LINE = 14
+
+
+def _cells(board, highlight_moves=None, threatened=None):
+    # Клетки в порядке вывода: горизонтали с 8-й по 1-ю, в каждой вертикали A-H.
+    highlight = set(highlight_moves or ())
+    threat = set(threatened or ())
+    cells = []
+    for row in range(7, -1, -1):
+        grid_row = board.grid[row]
+        for col in range(8):
+            piece = grid_row[col]
+            symbol = piece.symbol if piece else "."
+            if (row, col) in highlight:
+                cells.append(f"[{symbol}]")
+            elif (row, col) in threat:
+                cells.append(f"*{symbol}*")
+            else:
+                cells.append(f" {symbol} ")
+    return cells
+
+
+def render_plain(board, highlight_moves=None, threatened=None):
+    """Формирует полный кадр доски в виде одной строки.
+
+    Args:
+        board (Board): Доска.
+        highlight_moves (iterable, optional): Позиции (row, col) для подсветки ходов.
+        threatened (iterable, optional): Позиции (row, col) угрожаемых фигур.
+
+    Returns:
+        str: Текст кадра, включая завершающий перевод строки.
+    """
+    return _frame(_cells(board, highlight_moves, threatened), _footer(board))
+
+
+def _footer(board):
+    return f"Ходов сделано: {board.move_count}"
+
+
+def _frame(cells, footer):
+    lines = ["", FILES]
+    for index in range(8):
+        rank = 8 - index
+        lines.append(f"{rank} {''.join(cells[index * 8:index * 8 + 8])} {rank}")
+    lines += [FILES, "", footer, ""]
+    return "\n".join(lines)
+
+
+class TerminalRenderer:
+    """Отрисовка доски в терминале ANSI с перерисовкой только изменившихся клеток.
+
+    Первый кадр (и кадр после invalidate) очищает экран и выводится целиком;
+    дальше в поток пишутся только команды перемещения курсора и новые клетки.
+    Каждый кадр собирается в одну строку и записывается одним вызовом write.
+    После кадра курсор ставится под доску, а строки ниже очищаются, чтобы
+    сообщения игры не накапливались на экране.
+
+    Args:
+        stream (file, optional): Поток вывода; по умолчанию sys.stdout.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._cells = None
+        self._footer = None
+
+    def invalidate(self):
+        """Требует полной перерисовки следующего кадра (например, после изменения экрана извне)."""
+        self._cells = None
+        self._footer = None
+
+    def draw(self, board, highlight_moves=None, threatened=None):
+        """Выводит кадр доски.
+
+        Args:
+            board (Board): Доска.
+            highlight_moves (iterable, optional): Позиции (row, col) для подсветки ходов.
+            threatened (iterable, optional): Позиции (row, col) угрожаемых фигур.
+
+        Returns:
+            int: Сколько клеток перерисовано.
+        """
+        frame = self.render(board, highlight_moves, threatened)
+        self.stream.write(frame[0])
+        self.stream.flush()
+        return frame[1]
+
+    def render(self, board, highlight_moves=None, threatened=None):
+        """Строит кадр без вывода.
+
+        Returns:
+            tuple: (строка с командами ANSI, число перерисованных клеток).
+        """
+        cells = _cells(board, highlight_moves, threatened)
+        footer = _footer(board)
+        previous = self._cells
+        if previous is None:
+            parts = ["\x1b[H\x1b[2J", _frame(cells, footer)]
+            changed = len(cells)
+        else:
+            parts = []
+            changed = 0
+            for index, cell in enumerate(cells):
+                if cell != previous[index]:
+                    line = BOARD_TOP + index // 8 + 1
+                    column = CELL_LEFT + (index % 8) * CELL_WIDTH
+                    parts.append(f"\x1b[{line};{column}H{cell}")
+                    changed += 1
+            if footer != self._footer:
+                parts.append(f"\x1b[{FOOTER_LINE};1H\x1b[K{footer}")
+        parts.append(f"\x1b[{PROMPT_LINE};1H\x1b[J")
+        self._cells = cells
+        self._footer = footer
+        return "".join(parts), changed
@@ -0,0 +1,219 @@
+import argparse
+import sys
+
+from bitboard import create_board, BACKENDS
+from board import parse_square
+from fen import load_fen, board_to_fen
+
+EVENT_KINDS = ("move", "capture", "promotion", "castling", "en_passant", "check", "checkmate", "stalemate", "illegal")
+
+
+class GameRecord:
+    """Одна партия из архива: начальная позиция и список ходов в формате консоли.
+
+    Args:
+        number (int): Порядковый номер партии в архиве (с 1).
+        version (int): Вариант расстановки (1 или 2).
+        moves (list): Ходы вида "E2 E4".
+        fen (str, optional): Начальная позиция, если партия начата не с расстановки.
+        line (int): Номер строки архива, с которой начинается партия.
+    """
+
+    def __init__(self, number, version, moves, fen=None, line=0):
+        self.number = number
+        self.version = version
+        self.moves = moves
+        self.fen = fen
+        self.line = line
+
+
+class ReplayEvent:
+    """Событие воспроизведения одного хода.
+
+    Доска board общая для всего потока: после перехода к следующему событию
+    она уже содержит другую позицию.
+
+    Args:
+        game (GameRecord): Партия, к которой относится ход.
+        ply (int): Номер полухода в партии (с 1).
+        text (str): Ход в записи архива.
+        board (Board): Доска после хода (для неверного хода — до него).
+        move (Move, optional): Выполненный ход; None, если ход неверный.
+        kinds (frozenset): Виды события из EVENT_KINDS.
+        error (str, optional): Причина, если ход не удалось выполнить.
+    """
+
+    def __init__(self, game, ply, text, board, move=None, kinds=frozenset(), error=None):
+        self.game = game
+        self.ply = ply
+        self.text = text
+        self.board = board
+        self.move = move
+        self.kinds = kinds
+        self.error = error
+
+
+def read_games(source):
+    """Построчно читает архив партий, не загружая его в память целиком.
+
+    Формат архива: по одному ходу "E2 E4" в строке, партии разделены пустой
+    строкой. Строки заголовка "# version 2" и "# fen <FEN>" задают начальную
+    позицию следующей партии, прочие строки с "#" — комментарии.
+
+    Args:
+        source (str or file): Путь к файлу или открытый текстовый файл.
+
+    Yields:
+        GameRecord: Очередная партия.
+    """
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as stream:
+            yield from _read_game_lines(stream)
+    else:
+        yield from _read_game_lines(source)
+
+
+def _read_game_lines(stream):
+    number = 0
+    version, fen, moves, start = 1, None, [], 0
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            if moves:
+                number += 1
+                yield GameRecord(number, version, moves, fen, start)
+            version, fen, moves, start = 1, None, [], 0
+            continue
+        if line.startswith("#"):
+            key, _, value = line[1:].strip().partition(" ")
+            if key == "version" and value.strip() in ("1", "2"):
+                version = int(value)
+            elif key == "fen":
+                fen = value.strip()
+            continue
+        if not start:
+            start = line_number
+        moves.append(line)
+    if moves:
+        yield GameRecord(number + 1, version, moves, fen, start)
+
+
+def replay_games(games, board=None, backend="grid"):
+    """Воспроизводит партии на одной доске и выдает событие на каждый ход.
+
+    После неверного хода выдается событие "illegal", остаток партии пропускается.
+
+    Args:
+        games (iterable): Поток GameRecord (например, из read_games).
+        board (Board, optional): Доска для повторного использования.
+        backend (str): Тип доски, если board не задана.
+
+    Yields:
+        ReplayEvent: Событие очередного хода.
+    """
+    if board is None:
+        board = create_board(backend)
+    for game in games:
+        if game.fen:
+            load_fen(board, game.fen)
+        else:
+            board.clear()
+            board.setup_initial_position(game.version)
+        for ply, text in enumerate(game.moves, 1):
+            event = _replay_move(board, game, ply, text)
+            yield event
+            if event.error:
+                break
+
+
+def _replay_move(board, game, ply, text):
+    try:
+        from_pos, to_pos = (parse_square(square) for square in text.split())
+    except ValueError:
+        return ReplayEvent(game, ply, text, board, kinds=frozenset(("illegal",)), error="Неверный ввод")
+    piece = board.get_piece(*from_pos)
+    if piece is None or piece.color != board.turn or not board.move_piece(from_pos, to_pos):
+        return ReplayEvent(game, ply, text, board, kinds=frozenset(("illegal",)), error="Неверный ход")
+    move = board.move_history[-1]
+    kinds = {"move"}
+    if move.captured is not None:
+        kinds.add("capture")
+        if move.captured_pos != move.to_pos:
+            kinds.add("en_passant")
+    if move.promoted_to is not None:
+        kinds.add("promotion")
+    if move.rook_from is not None:
+        kinds.add("castling")
+    check = board.is_in_check(board.turn)
+    if check:
+        kinds.add("check")
+    if not board.generate_legal_moves(board.turn):
+        kinds.add("checkmate" if check else "stalemate")
+    return ReplayEvent(game, ply, text, board, move, frozenset(kinds))
+
+
+def filter_events(events, *kinds):
+    """Пропускает только события заданных видов."""
+    wanted = set(kinds)
+    for event in events:
+        if event.kinds & wanted:
+            yield event
+
+
+def positions(events):
+    """Превращает поток событий в поток позиций после каждого хода.
+
+    Yields:
+        tuple: (номер партии, номер полухода, FEN позиции).
+    """
+    for event in events:
+        if not event.error:
+            yield event.game.number, event.ply, board_to_fen(event.board)
+
+
+def summarize(events):
+    """Подсчитывает партии, ходы и события по видам.
+
+    Args:
+        events (iterable): Поток ReplayEvent.
+
+    Returns:
+        dict: Счетчики "games", "plies" и по каждому виду из EVENT_KINDS.
+    """
+    counts = dict.fromkeys(("games", "plies") + EVENT_KINDS, 0)
+    last_game = None
+    for event in events:
+        if event.game is not last_game:
+            counts["games"] += 1
+            last_game = event.game
+        if not event.error:
+            counts["plies"] += 1
+        for kind in event.kinds:
+            counts[kind] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Потоковое воспроизведение архива партий.")
+    parser.add_argument("archive", help="файл архива ('-' — стандартный ввод)")
+    parser.add_argument("--events", help="вывести события заданных видов через запятую (например, check,checkmate)")
+    parser.add_argument("--positions", action="store_true", help="вывести FEN после каждого хода")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="grid", help="тип доски")
+    args = parser.parse_args()
+
+    games = read_games(sys.stdin if args.archive == "-" else args.archive)
+    events = replay_games(games, backend=args.backend)
+    if args.positions:
+        for number, ply, fen in positions(events):
+            print(f"{number}\t{ply}\t{fen}")
+    elif args.events:
+        for event in filter_events(events, *args.events.split(",")):
+            detail = event.error or ",".join(sorted(event.kinds - {"move"}))
+            print(f"партия {event.game.number} (строка {event.game.line}), ход {event.ply}: {event.text}  {detail}")
+    else:
+        for kind, count in summarize(events).items():
+            print(f"{kind}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import multiprocessing
+import queue
+import random
+import time
+
+from bitboard import create_board
+from engine import Engine
+from transposition import TranspositionTable
+
+POLICIES = ("random", "search")
+MAX_PLIES = 300
+RANDOM_PLIES = 6
+QUEUE_SIZE = 256
+BATCH_SIZE = 64
+WORKER_TT_MB = 4
+RESULTS = {"white": "1-0", "black": "0-1", None: "1/2-1/2"}
+
+
+class SelfPlayGame:
+    """Сыгранная партия самоигры.
+
+    Args:
+        index (int): Номер партии в прогоне (от 0).
+        version (int): Вариант начальной расстановки.
+        seed (str): Зерно генератора, по которому партию можно повторить.
+        moves (list): Ходы в формате "E2 E4".
+        winner (str, optional): "white", "black" или None при ничьей.
+        reason (str): "checkmate", "stalemate", "repetition", "material" или "limit".
+    """
+
+    __slots__ = ("index", "version", "seed", "moves", "winner", "reason")
+
+    def __init__(self, index, version, seed, moves, winner, reason):
+        self.index = index
+        self.version = version
+        self.seed = seed
+        self.moves = moves
+        self.winner = winner
+        self.reason = reason
+
+    def to_text(self):
+        """Возвращает партию в формате архива replay.read_games (с пустой строкой в конце)."""
+        lines = [f"# version {self.version}", f"# seed {self.seed}",
+                 f"# result {RESULTS[self.winner]} {self.reason}"]
+        return "\n".join(lines + self.moves) + "\n\n"
+
+
+def play_game(index, version=2, seed=0, policy="random", depth=1, max_plies=MAX_PLIES,
+              random_plies=RANDOM_PLIES, backend="grid"):
+    """Играет одну партию самоигры.
+
+    Ход выбирается случайно из легальных ("random") или поиском на глубину depth
+    ("search"); в режиме поиска первые random_plies полуходов случайны, чтобы
+    партии различались. Генератор инициализируется строкой "seed:index", так что
+    партия повторяется при том же зерне независимо от числа процессов.
+
+    Args:
+        index (int): Номер партии.
+        version (int): Вариант начальной расстановки.
+        seed (int): Зерно прогона.
+        policy (str): "random" или "search".
+        depth (int): Глубина поиска для "search".
+        max_plies (int): Ограничение длины партии; дальше — ничья.
+        random_plies (int): Сколько первых полуходов случайны в режиме "search".
+        backend (str): Тип доски.
+
+    Returns:
+        SelfPlayGame: Партия.
+    """
+    game_seed = f"{seed}:{index}"
+    rng = random.Random(game_seed)
+    board = create_board(backend)
+    board.setup_initial_position(version)
+    engine = Engine(board, TranspositionTable(WORKER_TT_MB)) if policy == "search" else None
+    seen = {board.hash: 1}
+    moves = []
+    winner, reason = None, "limit"
+    while len(moves) < max_plies:
+        legal = board.generate_legal_moves(board.turn)
+        if not legal:
+            if board.is_in_check(board.turn):
+                winner, reason = ("black" if board.turn == "white" else "white"), "checkmate"
+            else:
+                reason = "stalemate"
+            break
+        if engine is None or len(moves) < random_plies:
+            move = rng.choice(legal)
+        else:
+            move = engine.search(depth).move
+        moves.append(str(move))
+        board.make_move(move)
+        if all(len(pieces) == 1 for pieces in (board.get_pieces("white"), board.get_pieces("black"))):
+            reason = "material"
+            break
+        seen[board.hash] = seen.get(board.hash, 0) + 1
+        if seen[board.hash] >= 3:
+            reason = "repetition"
+            break
+    return SelfPlayGame(index, version, game_seed, moves, winner, reason)
+
+
+class SelfPlayStats:
+    """Сводка самоигры по вариантам: победы, ничьи, средняя длина, причины окончания."""
+
+    def __init__(self):
+        self.variants = {}
+        self.games = 0
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, game):
+        """Учитывает партию."""
+        entry = self.variants.setdefault(game.version, {"games": 0, "white": 0, "black": 0, "draw": 0,
+                                                        "plies": 0, "reasons": {}})
+        entry["games"] += 1
+        entry[game.winner or "draw"] += 1
+        entry["plies"] += len(game.moves)
+        entry["reasons"][game.reason] = entry["reasons"].get(game.reason, 0) + 1
+        self.games += 1
+        self.elapsed = time.perf_counter() - self.start
+
+    @property
+    def games_per_second(self):
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    def format(self):
+        """Возвращает сводку в виде текста."""
+        lines = [f"Партий: {self.games}, {self.elapsed:.1f} c, {self.games_per_second:.2f} партий/с"]
+        for version, entry in sorted(self.variants.items()):
+            games = entry["games"]
+            reasons = ", ".join(f"{name} {count}" for name, count in sorted(entry["reasons"].items()))
+            lines.append(f"Вариант {version}: партий {games}, белые {entry['white'] / games:.1%}, "
+                         f"черные {entry['black'] / games:.1%}, ничьи {entry['draw'] / games:.1%}, "
+                         f"средняя длина {entry['plies'] / games:.1f} полуходов ({reasons})")
+        return "\n".join(lines)
+
+
+def _worker(results, indices, versions, seed, policy, depth, max_plies, backend):
+    # Процесс самоигры: играет свои партии и кладет их в ограниченную очередь (ждет, если писатель отстает).
+    try:
+        for index in indices:
+            results.put(play_game(index, versions[index % len(versions)], seed, policy, depth, max_plies,
+                                  backend=backend))
+    finally:
+        results.put(None)
+
+
+def generate_games(path, games, workers=2, versions=(2,), seed=0, policy="random", depth=1,
+                   max_plies=MAX_PLIES, backend="grid", batch_size=BATCH_SIZE, queue_size=QUEUE_SIZE,
+                   progress=None):
+    """Играет партии самоигры в нескольких процессах и дописывает их в архив.
+
+    Процессы передают готовые партии через очередь ограниченного размера
+    единственному писателю в текущем процессе. Писатель восстанавливает порядок
+    партий по номерам и дописывает их в файл пачками по batch_size, поэтому при
+    одинаковых параметрах файл не зависит от числа процессов. Формат файла —
+    архив replay.read_games с заголовками "# seed" и "# result".
+
+    Args:
+        path (str): Файл архива (дописывается).
+        games (int): Число партий.
+        workers (int): Число процессов.
+        versions (tuple): Варианты расстановки, чередуются по номеру партии.
+        seed (int): Зерно прогона.
+        policy (str): "random" или "search".
+        depth (int): Глубина поиска для "search".
+        max_plies (int): Ограничение длины партии.
+        backend (str): Тип доски.
+        batch_size (int): Сколько партий записывать за раз.
+        queue_size (int): Емкость очереди между процессами и писателем.
+        progress (callable, optional): Вызывается с SelfPlayStats после каждой записанной пачки.
+
+    Returns:
+        SelfPlayStats: Сводка по сыгранным партиям.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Неизвестный способ выбора хода: {policy}")
+    workers = max(1, min(workers, games))
+    results = multiprocessing.Queue(queue_size)
+    processes = [multiprocessing.Process(target=_worker, daemon=True,
+                                         args=(results, range(worker, games, workers), tuple(versions), seed,
+                                               policy, depth, max_plies, backend))
+                 for worker in range(workers)]
+    stats = SelfPlayStats()
+    waiting = {}
+    batch = []
+    next_index = 0
+    running = workers
+    for process in processes:
+        process.start()
+    try:
+        with open(path, "a", encoding="utf-8") as archive:
+            while running:
+                try:
+                    game = results.get(timeout=1.0)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        raise RuntimeError("Процессы самоигры завершились с ошибкой")
+                    continue
+                if game is None:
+                    running -= 1
+                    continue
+                waiting[game.index] = game
+                while next_index in waiting:
+                    game = waiting.pop(next_index)
+                    next_index += 1
+                    stats.add(game)
+                    batch.append(game.to_text())
+                    if len(batch) >= batch_size:
+                        archive.write("".join(batch))
+                        archive.flush()
+                        batch = []
+                        if progress:
+                            progress(stats)
+            if batch:
+                archive.write("".join(batch))
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+    if next_index != games:
+        raise RuntimeError(f"Сыграно {next_index} партий из {games}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Самоигра: генерация архива партий в нескольких процессах.")
+    parser.add_argument("path", help="файл архива (дописывается)")
+    parser.add_argument("--games", type=int, default=100, help="число партий")
+    parser.add_argument("--workers", type=int, default=2, help="число процессов")
+    parser.add_argument("--versions", default="2", help="варианты расстановки через запятую")
+    parser.add_argument("--seed", type=int, default=0, help="зерно генератора")
+    parser.add_argument("--policy", choices=POLICIES, default="random", help="выбор хода")
+    parser.add_argument("--depth", type=int, default=1, help="глубина поиска для --policy search")
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES, help="ограничение длины партии")
+    parser.add_argument("--backend", choices=("grid", "bitboard"), default="grid", help="тип доски")
+    args = parser.parse_args()
+
+    versions = tuple(int(version) for version in args.versions.split(","))
+    stats = generate_games(args.path, args.games, args.workers, versions, args.seed, args.policy, args.depth,
+                           args.max_plies, args.backend,
+                           progress=lambda stats: print(f"\r{stats.games}/{args.games}", end="", flush=True))
+    print()
+    print(stats.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from board import square_name
+from fen import board_to_fen
+from game import ChessGame
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7777
+DEFAULT_WORKERS = 4
+MAX_LINE = 1024
+
+
+def execute(game, line):
+    """Выполняет одну команду протокола над партией и возвращает строку ответа.
+
+    Вызывается в потоке пула: все проверки правил (шах, мат, легальные ходы)
+    выполняются здесь, а не в цикле событий.
+
+    Команды: "E2 E4", "undo [n]", "redo [n]", "hint E2", "threat", "moves",
+    "status", "fen".
+
+    Args:
+        game (ChessGame): Партия.
+        line (str): Команда без перевода строки.
+
+    Returns:
+        str: Ответ без перевода строки.
+    """
+    command, *args = line.split()
+    command = command.lower()
+    try:
+        if command in ("undo", "redo"):
+            count = int(args[0]) if args else 1
+            if count < 0:
+                raise ValueError
+            done = game.undo(count) if command == "undo" else game.redo(count)
+            return f"{command} {done}"
+        if command == "hint":
+            if len(args) != 1:
+                raise ValueError
+            return " ".join(["hint"] + [square_name(pos) for pos in game.hint(args[0])])
+        if command == "threat":
+            return " ".join(["threat"] + [square_name(pos) for pos in game.threats()])
+        if command == "moves":
+            return "moves " + ",".join(game.legal_moves())
+        if command == "status":
+            status = game.status()
+            state = "checkmate" if status.checkmate else "stalemate" if status.stalemate else (
+                "check" if status.check else "-")
+            return f"status {status.turn} {status.move_count} {state}"
+        if command == "fen":
+            return f"fen {board_to_fen(game.board)}"
+    except (ValueError, IndexError):
+        return "error Неверный ввод"
+    result = game.apply(line)
+    if not result.ok:
+        return f"error {result.error}"
+    suffix = " checkmate" if result.checkmate else " check" if result.check else ""
+    return f"ok {square_name(result.move.from_pos)} {square_name(result.move.to_pos)}{suffix}"
+
+
+class GameServer:
+    """Сервер партий по TCP со строковым протоколом.
+
+    Каждая строка запроса получает ровно одну строку ответа. Соединение сначала
+    создает партию командой "new [версия]" или подключается к существующей
+    командой "join <номер>"; дальше принимаются команды execute и "quit".
+    Партии хранятся в памяти, пока к ним подключено хотя бы одно соединение.
+
+    Команды партии выполняются в пуле потоков по одной за раз для каждой партии
+    (asyncio.Lock), поэтому долгая проверка мата в одной партии не задерживает
+    чтение и запись остальных соединений. Пропускная способность при этом не
+    растет с числом потоков: из-за GIL проверки правил идут на одном ядре.
+
+    Args:
+        workers (int): Число потоков для проверки правил.
+        backend (str): Тип доски новых партий: "grid" или "bitboard".
+        max_games (int, optional): Ограничение числа одновременных партий.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, backend="grid", max_games=None):
+        self.executor = ThreadPoolExecutor(workers)
+        self.backend = backend
+        self.max_games = max_games
+        self.games = {}
+        self._ids = itertools.count(1)
+        self.connections = 0
+        self.commands = 0
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Запускает сервер и обслуживает соединения до отмены задачи."""
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader, writer):
+        """Обслуживает одно соединение."""
+        self.connections += 1
+        game_id = None
+        try:
+            while True:
+                try:
+                    data = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    break
+                if not data:
+                    break
+                line = data.decode("utf-8", "replace").strip()
+                if not line:
+                    continue
+                if line.lower() == "quit":
+                    break
+                command, *args = line.split()
+                if command.lower() in ("new", "join"):
+                    new_id, reply = self._attach(command.lower(), args)
+                    if new_id is not None:
+                        self._detach(game_id)
+                        game_id = new_id
+                elif game_id is None:
+                    reply = "error Нет партии: сначала new или join"
+                else:
+                    reply = await self._run(game_id, line)
+                self.commands += 1
+                writer.write(reply.encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._detach(game_id)
+            self.connections -= 1
+            writer.close()
+
+    async def _run(self, game_id, line):
+        game, lock, _ = self.games[game_id]
+        async with lock:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, execute, game, line)
+
+    def _attach(self, command, args):
+        try:
+            if command == "new":
+                version = int(args[0]) if args else 1
+                if version not in (1, 2):
+                    raise ValueError
+                if self.max_games is not None and len(self.games) >= self.max_games:
+                    return None, "error Слишком много партий"
+                game_id = next(self._ids)
+                self.games[game_id] = [ChessGame(version, self.backend), asyncio.Lock(), 0]
+            else:
+                game_id = int(args[0])
+                if game_id not in self.games:
+                    return None, f"error Партия {game_id} не найдена"
+        except (ValueError, IndexError):
+            return None, "error Неверный ввод"
+        self.games[game_id][2] += 1
+        return game_id, f"game {game_id}"
+
+    def _detach(self, game_id):
+        entry = self.games.get(game_id)
+        if entry is not None:
+            entry[2] -= 1
+            if entry[2] == 0:
+                del self.games[game_id]
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def _load_worker(host, port, queue, max_plies, rng, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    played = 0
+
+    async def request(line):
+        writer.write(line.encode() + b"\n")
+        await writer.drain()
+        return (await reader.readline()).decode().strip()
+
+    try:
+        while True:
+            try:
+                version = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if not (await request(f"new {version}")).startswith("game"):
+                break
+            for _ in range(max_plies):
+                moves = (await request("moves"))[len("moves "):]
+                if not moves:
+                    break
+                start = time.perf_counter()
+                reply = await request(rng.choice(moves.split(",")))
+                latencies.append(time.perf_counter() - start)
+                if not reply.startswith("ok") or reply.endswith("checkmate"):
+                    break
+            played += 1
+        writer.write(b"quit\n")
+        await writer.drain()
+    finally:
+        writer.close()
+    return played
+
+
+async def run_load(host=DEFAULT_HOST, port=DEFAULT_PORT, games=100, concurrency=50, max_plies=60, seed=0):
+    """Нагрузочный клиент: играет случайными ходами много партий одновременно.
+
+    Args:
+        host (str): Адрес сервера.
+        port (int): Порт сервера.
+        games (int): Сколько партий сыграть.
+        concurrency (int): Сколько соединений ведут партии одновременно.
+        max_plies (int): Ограничение длины партии в полуходах.
+        seed (int): Зерно генератора случайных ходов.
+
+    Returns:
+        dict: games, moves, elapsed, games_per_second, p50 и p99 (задержка хода в секундах).
+    """
+    queue = asyncio.Queue()
+    for index in range(games):
+        queue.put_nowait(1 + index % 2)
+    latencies = []
+    start = time.perf_counter()
+    played = await asyncio.gather(*(_load_worker(host, port, queue, max_plies, random.Random(seed + index), latencies)
+                                    for index in range(min(concurrency, games))))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {"games": sum(played), "moves": len(latencies), "elapsed": elapsed,
+            "games_per_second": sum(played) / elapsed if elapsed else 0.0,
+            "p50": _percentile(latencies, 0.5), "p99": _percentile(latencies, 0.99)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сервер партий по TCP и нагрузочный клиент.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve = subparsers.add_parser("serve", help="запустить сервер")
+    serve.add_argument("--host", default=DEFAULT_HOST, help="адрес")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help="порт")
+    serve.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="потоков для проверки правил")
+    serve.add_argument("--backend", choices=("grid", "bitboard"), default="grid", help="способ хранения доски")
+    serve.add_argument("--max-games", type=int, help="ограничение числа одновременных партий")
+    load = subparsers.add_parser("load", help="нагрузочный тест работающего сервера")
+    load.add_argument("--host", default=DEFAULT_HOST, help="адрес")
+    load.add_argument("--port", type=int, default=DEFAULT_PORT, help="порт")
+    load.add_argument("--games", type=int, default=100, help="сколько партий сыграть")
+    load.add_argument("--concurrency", type=int, default=50, help="одновременных соединений")
+    load.add_argument("--plies", type=int, default=60, help="ограничение длины партии")
+    load.add_argument("--seed", type=int, default=0, help="зерно генератора ходов")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = GameServer(args.workers, args.backend, args.max_games)
+        print(f"Сервер слушает {args.host}:{args.port}")
+        try:
+            asyncio.run(server.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return
+    stats = asyncio.run(run_load(args.host, args.port, args.games, args.concurrency, args.plies, args.seed))
+    print(f"Партий: {stats['games']}, ходов: {stats['moves']}, {stats['elapsed']:.2f} c, "
+          f"{stats['games_per_second']:.1f} партий/с")
+    print(f"Задержка хода: p50 {stats['p50'] * 1000:.2f} мс, p99 {stats['p99'] * 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,547 @@
+import argparse
+import glob
+import mmap
+import os
+import struct
+import time
+
+from board import REGULAR_PIECES, square_name
+from pieces import Pawn, King
+from zobrist import castling_rights
+
+MAGIC = b"CTB1"
+HEADER = struct.Struct("<4sB16s")
+EXTENSION = ".ctb"
+ILLEGAL = 255
+MAX_DTM = 253
+WIN, DRAW, LOSS = 1, 0, -1
+
+PIECE_CLASSES = tuple(cls for cls in REGULAR_PIECES if cls not in (Pawn, King))
+LETTERS = {cls: cls("white").symbol for cls in PIECE_CLASSES}
+CLASSES_BY_LETTER = {letter: cls for cls, letter in LETTERS.items()}
+
+# Для каждой из 8 симметрий доски — таблица перестановки клеток (клетка = row * 8 + col).
+TRANSFORMS = tuple(
+    tuple(((7 - col if flip_row else col) if swap else (7 - row if flip_row else row)) * 8
+          + ((7 - row if flip_col else row) if swap else (7 - col if flip_col else col))
+          for row in range(8) for col in range(8))
+    for swap in (False, True) for flip_row in (False, True) for flip_col in (False, True)
+)
+TRIANGLE = tuple(row * 8 + col for row in range(4) for col in range(row, 4))
+TRIANGLE_INDEX = {square: index for index, square in enumerate(TRIANGLE)}
+# Симметрии, переводящие короля слабой стороны в треугольник a1-d1-d4 (одна или две для диагонали).
+KING_TRANSFORMS = tuple(tuple(transform for transform in TRANSFORMS if transform[square] in TRIANGLE_INDEX)
+                        for square in range(64))
+
+
+def _square(coords):
+    return coords[0] * 8 + coords[1]
+
+
+def _coords(square):
+    return divmod(square, 8)
+
+
+def _is_symmetric(piece_class):
+    # Правила хода заданы таблицами прыжков и лучей; таблицы должны переходить в себя при симметриях доски.
+    for transform in TRANSFORMS:
+        for square in range(64):
+            coords = _coords(square)
+            image = _coords(transform[square])
+            leaps = {_coords(transform[_square(target)]) for target in piece_class.leap_table[coords]}
+            if leaps != set(piece_class.leap_table[image]):
+                return False
+            rays = {tuple(_coords(transform[_square(target)]) for target in ray) for ray in piece_class.ray_table[coords]}
+            if rays != set(piece_class.ray_table[image]):
+                return False
+    return True
+
+
+def _build_origins(piece_class):
+    # origins[клетка] — клетки, с которых фигура в принципе может прийти на эту клетку.
+    origins = [set() for _ in range(64)]
+    for row in range(8):
+        for col in range(8):
+            targets = set(piece_class.leap_table[(row, col)])
+            for ray in piece_class.ray_table[(row, col)]:
+                targets.update(ray)
+            for target in targets:
+                origins[_square(target)].add(row * 8 + col)
+    return tuple(tuple(sorted(squares)) for squares in origins)
+
+
+def parse_material(material):
+    """Разбирает запись набора фигур вида "KQvK" или "KDMvK".
+
+    Args:
+        material (str): Фигуры сильной стороны (король и 1-3 фигуры), "v", одинокий король.
+
+    Returns:
+        tuple: Классы фигур сильной стороны без короля в порядке REGULAR_PIECES.
+
+    Raises:
+        ValueError: Если запись неверна или набор не поддерживается.
+    """
+    strong, separator, weak = material.upper().partition("V")
+    if not separator or weak != "K" or not strong.startswith("K") or not 2 <= len(strong) <= 4:
+        raise ValueError(f"Неверный набор фигур: {material}")
+    try:
+        classes = [CLASSES_BY_LETTER[letter] for letter in strong[1:]]
+    except KeyError:
+        raise ValueError(f"Неверный набор фигур: {material}") from None
+    for piece_class in classes:
+        if not _is_symmetric(piece_class):
+            raise ValueError(f"Фигура {piece_class.__name__} не симметрична, таблица не поддерживается")
+    return tuple(sorted(classes, key=PIECE_CLASSES.index))
+
+
+def material_name(classes):
+    """Возвращает каноническую запись набора: "K" + фигуры сильной стороны + "vK"."""
+    return "K" + "".join(LETTERS[cls] for cls in sorted(classes, key=PIECE_CLASSES.index)) + "vK"
+
+
+def table_size(piece_count):
+    """Число индексов в таблице для piece_count фигур (включая обоих королей)."""
+    return len(TRIANGLE) * 64 ** (piece_count - 1)
+
+
+def position_index(squares):
+    """Индекс позиции в таблице.
+
+    Args:
+        squares (sequence): Клетки (row * 8 + col): король сильной стороны, её фигуры
+            в порядке набора, король слабой стороны.
+
+    Returns:
+        int: Наименьший индекс среди симметричных позиций, где король слабой стороны в треугольнике a1-d1-d4.
+    """
+    best = None
+    for transform in KING_TRANSFORMS[squares[-1]]:
+        index = TRIANGLE_INDEX[transform[squares[-1]]]
+        for square in squares[:-1]:
+            index = index * 64 + transform[square]
+        if best is None or index < best:
+            best = index
+    return best
+
+
+def _decode_index(index, piece_count):
+    squares = []
+    for _ in range(piece_count - 1):
+        index, square = divmod(index, 64)
+        squares.append(square)
+    squares.reverse()
+    squares.append(TRIANGLE[index])
+    return squares
+
+
+class TablebaseFile:
+    """Таблица одного набора фигур, отображенная в память.
+
+    Файл: заголовок HEADER (сигнатура, число фигур, набор), затем table_size байт
+    для позиций с ходом сильной стороны и столько же — с ходом одинокого короля.
+    Байт 0 — ничья, ILLEGAL — невозможная или неканоническая позиция, иначе
+    значение минус 1 — число полуходов до мата (выигрыш сильной стороны).
+
+    Args:
+        path (str): Путь к файлу таблицы.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, piece_count, material = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"Неверный формат таблицы: {path}")
+        self.material = material.rstrip(b"\0").decode()
+        self.classes = parse_material(self.material)
+        self.piece_count = piece_count
+        self.size = table_size(piece_count)
+
+    def value(self, squares, strong_to_move):
+        """Возвращает байт таблицы для позиции (см. описание формата)."""
+        offset = HEADER.size + (0 if strong_to_move else self.size)
+        return self._map[offset + position_index(squares)]
+
+    def summary(self):
+        """Возвращает (число выигранных позиций с ходом сильной стороны, самый долгий мат в полуходах)."""
+        values = [byte - 1 for byte in self._map[HEADER.size:HEADER.size + self.size] if byte not in (0, ILLEGAL)]
+        return len(values), max(values, default=0)
+
+    def close(self):
+        self._map.close()
+
+
+class _Grid:
+    # Минимальная доска для правил фигур: get_valid_moves и get_attacks обращаются только к grid.
+
+    __slots__ = ("grid",)
+
+    def __init__(self):
+        self.grid = [[None] * 8 for _ in range(8)]
+
+
+class _Generator:
+    def __init__(self, classes, subtables):
+        self.classes = classes
+        self.piece_count = len(classes) + 2
+        self.size = table_size(self.piece_count)
+        self.subtables = subtables
+        self.board = _Grid()
+        self.strong_pieces = [King("white")] + [cls("white") for cls in classes]
+        self.weak_king = King("black")
+        self.origins = [_build_origins(type(piece)) for piece in self.strong_pieces]
+        self.strong = bytearray(self.size)
+        self.weak = bytearray(self.size)
+        self.blocked = bytearray(self.size)
+
+    def _place(self, squares):
+        grid = self.board.grid
+        for piece, square in zip(self.strong_pieces + [self.weak_king], squares):
+            row, col = divmod(square, 8)
+            grid[row][col] = piece
+            piece.position = (row, col)
+
+    def _clear(self, squares):
+        grid = self.board.grid
+        for square in squares:
+            grid[square >> 3][square & 7] = None
+
+    def _attacked(self, square, skip=None):
+        coords = _coords(square)
+        for index, piece in enumerate(self.strong_pieces):
+            if index != skip and coords in piece.get_attacks(self.board):
+                return True
+        return False
+
+    def _weak_moves(self, squares):
+        # Ходы одинокого короля в расставленной позиции: список (клетка, индекс взятой фигуры или None).
+        grid = self.board.grid
+        king = self.weak_king
+        origin = squares[-1]
+        grid[origin >> 3][origin & 7] = None
+        moves = []
+        for row, col in King.leap_table[_coords(origin)]:
+            target = grid[row][col]
+            captured = None
+            if target is not None:
+                if target is self.strong_pieces[0]:
+                    continue
+                captured = self.strong_pieces.index(target)
+            grid[row][col] = king
+            king.position = (row, col)
+            if not self._attacked(row * 8 + col, captured):
+                moves.append((row * 8 + col, captured))
+            grid[row][col] = target
+        grid[origin >> 3][origin & 7] = king
+        king.position = _coords(origin)
+        return moves
+
+    def _capture_value(self, squares, captured):
+        # Значение позиции после взятия фигуры: ход сильной стороны, набор меньше на одну фигуру.
+        rest = squares[:captured] + squares[captured + 1:]
+        if len(rest) == 2:
+            return 0
+        return self.subtables[material_name(self.classes[:captured - 1] + self.classes[captured:])].value(rest, True)
+
+    def generate(self, progress=None):
+        size = self.size
+        strong, weak, blocked = self.strong, self.weak, self.blocked
+        pending = {}
+        frontier = []
+        for index in range(size):
+            if progress and index % 65536 == 0:
+                progress("scan", index, size)
+            squares = _decode_index(index, self.piece_count)
+            strong_king, weak_king = squares[0], squares[-1]
+            if (len(set(squares)) != len(squares) or position_index(squares) != index
+                    or max(abs((strong_king >> 3) - (weak_king >> 3)), abs((strong_king & 7) - (weak_king & 7))) <= 1):
+                strong[index] = weak[index] = ILLEGAL
+                continue
+            self._place(squares)
+            in_check = self._attacked(weak_king)
+            if in_check:
+                strong[index] = ILLEGAL
+            moves = self._weak_moves(squares)
+            self._clear(squares)
+            if not moves:
+                if in_check:
+                    weak[index] = 1
+                    frontier.append(index)
+                else:
+                    blocked[index] = 1
+                continue
+            worst = 0
+            for target, captured in moves:
+                if captured is not None:
+                    value = self._capture_value(squares[:-1] + [target], captured)
+                    if value == 0:
+                        blocked[index] = 1
+                        break
+                    worst = max(worst, value - 1)
+            else:
+                if worst:
+                    pending.setdefault(worst, []).append(index)
+
+        level = 0
+        while (frontier or any(key > level for key in pending)) and level < MAX_DTM - 1:
+            if progress:
+                progress("level", level, len(frontier))
+            won = []
+            for index in frontier:
+                for predecessor in self._strong_predecessors(index):
+                    if strong[predecessor] == 0:
+                        strong[predecessor] = level + 2
+                        won.append(predecessor)
+            level += 1
+            candidates = set(pending.pop(level, ()))
+            for index in won:
+                candidates.update(self._weak_predecessors(index))
+            frontier = [index for index in sorted(candidates)
+                        if weak[index] == 0 and not blocked[index] and self._all_lost(index, level)]
+            for index in frontier:
+                weak[index] = level + 2
+            level += 1
+        return strong, weak
+
+    def _strong_predecessors(self, index):
+        # Позиции с ходом сильной стороны, из которых ход одной из её фигур (без взятия) ведет в index.
+        squares = _decode_index(index, self.piece_count)
+        occupied = set(squares)
+        self._place(squares)
+        grid = self.board.grid
+        predecessors = []
+        for piece_index, piece in enumerate(self.strong_pieces):
+            current = squares[piece_index]
+            current_coords = _coords(current)
+            grid[current >> 3][current & 7] = None
+            for origin in self.origins[piece_index][current]:
+                if origin in occupied:
+                    continue
+                row, col = divmod(origin, 8)
+                grid[row][col] = piece
+                piece.position = (row, col)
+                if piece_index == 0 or current_coords in piece.get_valid_moves(self.board):
+                    moved = list(squares)
+                    moved[piece_index] = origin
+                    predecessors.append(position_index(moved))
+                grid[row][col] = None
+            grid[current >> 3][current & 7] = piece
+            piece.position = current_coords
+        self._clear(squares)
+        return predecessors
+
+    def _weak_predecessors(self, index):
+        # Позиции с ходом одинокого короля, из которых его ход (без взятия) ведет в index.
+        squares = _decode_index(index, self.piece_count)
+        occupied = set(squares)
+        predecessors = []
+        for coords in King.leap_table[_coords(squares[-1])]:
+            origin = _square(coords)
+            if origin not in occupied:
+                predecessors.append(position_index(squares[:-1] + [origin]))
+        return predecessors
+
+    def _all_lost(self, index, level):
+        # Все ходы одинокого короля ведут в выигранные сильной стороной позиции не дальше level полуходов.
+        squares = _decode_index(index, self.piece_count)
+        self._place(squares)
+        moves = self._weak_moves(squares)
+        self._clear(squares)
+        for target, captured in moves:
+            if captured is not None:
+                value = self._capture_value(squares[:-1] + [target], captured)
+            else:
+                value = self.strong[position_index(squares[:-1] + [target])]
+            if value == 0 or value == ILLEGAL or value - 1 > level:
+                return False
+        return True
+
+
+def table_path(directory, material):
+    """Путь к файлу таблицы набора в каталоге."""
+    return os.path.join(directory, material_name(parse_material(material)) + EXTENSION)
+
+
+def generate(material, directory=".", progress=None):
+    """Строит таблицу эндшпиля ретроградным анализом и записывает её в каталог.
+
+    Таблицы наборов, получающихся после взятия фигуры, строятся первыми, если
+    их еще нет в каталоге. Правила ходов берутся из классов фигур, поэтому
+    поддерживаются и новые фигуры (кот, собака, кролик).
+
+    Args:
+        material (str): Набор вида "KQvK", "KRvK", "KCvK", "KDMvK".
+        directory (str): Каталог таблиц.
+        progress (callable, optional): Вызывается как progress(этап, номер, всего).
+
+    Returns:
+        str: Путь к записанному файлу.
+    """
+    classes = parse_material(material)
+    name = material_name(classes)
+    subtables = {}
+    for index in range(len(classes)):
+        rest = classes[:index] + classes[index + 1:]
+        if rest:
+            sub_name = material_name(rest)
+            path = table_path(directory, sub_name)
+            if not os.path.exists(path):
+                generate(sub_name, directory, progress)
+            subtables[sub_name] = TablebaseFile(path)
+    try:
+        strong, weak = _Generator(classes, subtables).generate(progress)
+    finally:
+        for table in subtables.values():
+            table.close()
+    os.makedirs(directory, exist_ok=True)
+    path = table_path(directory, name)
+    with open(path + ".tmp", "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(classes) + 2, name.encode()))
+        file.write(strong)
+        file.write(weak)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+class Tablebases:
+    """Набор таблиц эндшпиля из каталога для проверки позиций без поиска.
+
+    Позиция покрыта, если у одной стороны только король, у другой — король и
+    фигуры без пешек, для которых есть таблица, и рокировки невозможны.
+
+    Args:
+        directory (str): Каталог с файлами *.ctb.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.tables = {}
+        for path in sorted(glob.glob(os.path.join(directory, "*" + EXTENSION))):
+            table = TablebaseFile(path)
+            self.tables[table.material] = table
+        self.max_pieces = max((table.piece_count for table in self.tables.values()), default=2)
+        self.hits = 0
+
+    def __len__(self):
+        return len(self.tables)
+
+    def close(self):
+        for table in self.tables.values():
+            table.close()
+        self.tables.clear()
+
+    def probe(self, board):
+        """Проверяет позицию по таблицам.
+
+        Args:
+            board (Board): Доска.
+
+        Returns:
+            tuple or None: (WIN, DRAW или LOSS для ходящего, полуходов до мата или 0)
+            или None, если позиция не покрыта.
+        """
+        white, black = board.piece_index["white"], board.piece_index["black"]
+        count = sum(len(pieces) for pieces in white.values()) + sum(len(pieces) for pieces in black.values())
+        if count > self.max_pieces:
+            return None
+        white_count = sum(len(pieces) for pieces in white.values())
+        weak_color = "black" if count - white_count == 1 else "white" if white_count == 1 else None
+        if weak_color is None or not board.piece_index[weak_color].get(King):
+            return None
+        strong_color = "white" if weak_color == "black" else "black"
+        pieces = [piece for piece_class, group in board.piece_index[strong_color].items()
+                  if piece_class is not King for piece in group]
+        kings = board.get_pieces(strong_color, King)
+        if len(kings) != 1:
+            return None
+        if not pieces:
+            return DRAW, 0
+        if any(type(piece) not in LETTERS for piece in pieces):
+            return None
+        table = self.tables.get(material_name([type(piece) for piece in pieces]))
+        if table is None or castling_rights(board):
+            return None
+        pieces.sort(key=lambda piece: PIECE_CLASSES.index(type(piece)))
+        squares = ([_square(kings[0].position)] + [_square(piece.position) for piece in pieces]
+                   + [_square(board.get_pieces(weak_color, King)[0].position)])
+        value = table.value(squares, board.turn == strong_color)
+        if value == ILLEGAL:
+            return None
+        self.hits += 1
+        if value == 0:
+            return DRAW, 0
+        return (WIN if board.turn == strong_color else LOSS), value - 1
+
+    def best_move(self, board):
+        """Выбирает ход по таблицам: быстрейший мат, самое долгое сопротивление или сохранение ничьей.
+
+        Args:
+            board (Board): Доска в покрытой позиции.
+
+        Returns:
+            tuple or None: (ход, (результат, полуходов до мата)) или None, если позиция
+            не покрыта или у ходящего нет ходов.
+        """
+        if self.probe(board) is None:
+            return None
+        best = None
+        best_key = None
+        for move in board.generate_legal_moves(board.turn):
+            board.make_move(move)
+            child = self.probe(board)
+            board.unmake_move()
+            if child is None:
+                continue
+            result, plies = -child[0], child[1] + 1 if child[0] != DRAW else 0
+            key = (result, -plies if result == WIN else plies)
+            if best_key is None or key > best_key:
+                best, best_key = move, key
+        if best is None:
+            return None
+        return best, (best_key[0], abs(best_key[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Таблицы эндшпиля: построение и проверка позиций.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("generate", help="построить таблицы")
+    build.add_argument("materials", nargs="+", help="наборы фигур, например KQvK KRvK KCvK KDMvK")
+    build.add_argument("--dir", default="tablebases", help="каталог таблиц")
+    probe = subparsers.add_parser("probe", help="проверить позицию")
+    probe.add_argument("fen", help="позиция в FEN")
+    probe.add_argument("--dir", default="tablebases", help="каталог таблиц")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        for material in args.materials:
+            start = time.perf_counter()
+            path = generate(material, args.dir,
+                            lambda stage, done, total: print(f"\r{stage} {done}/{total}   ", end="", flush=True))
+            table = TablebaseFile(path)
+            wins, longest = table.summary()
+            print(f"\r{table.material}: {path}, выигрышей {wins}, "
+                  f"самый долгий мат {longest} полуходов, {time.perf_counter() - start:.1f} c")
+            table.close()
+        return
+    from bitboard import create_board
+    from fen import load_fen
+    board = create_board()
+    load_fen(board, args.fen)
+    tablebases = Tablebases(args.dir)
+    result = tablebases.probe(board)
+    if result is None:
+        print("Позиция не покрыта таблицами.")
+        return
+    outcome, plies = result
+    print({WIN: f"Выигрыш, мат через {plies} полуходов", DRAW: "Ничья",
+           LOSS: f"Проигрыш, мат через {plies} полуходов"}[outcome])
+    choice = tablebases.best_move(board)
+    if choice is not None:
+        move = choice[0]
+        print(f"Лучший ход: {square_name(move.from_pos)} {square_name(move.to_pos)}")
+
+
+if __name__ == "__main__":
+    main()
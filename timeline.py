@@ -0,0 +1,117 @@
+from compact import CompactPosition
+
+CHECKPOINT_INTERVAL = 16
+RESTORE_COST = 8
+
+
+class Timeline:
+    """Линия партии с контрольными точками для быстрой навигации по ходам.
+
+    Хранит все ходы линии (в том числе отмененные, пока не сделан другой ход) и
+    компактные снимки позиции каждые interval полуходов. Переход к любому
+    полуходу выполняется либо ходами/отменами по одному, либо восстановлением
+    ближайшего снимка и повтором не более interval ходов — что дешевле.
+
+    После восстановления снимка board.move_history содержит только ходы,
+    сделанные после него; полная линия доступна через moves().
+
+    Args:
+        board (Board): Доска, на которой ведется партия.
+        interval (int): Через сколько полуходов сохраняются снимки.
+    """
+
+    def __init__(self, board, interval=CHECKPOINT_INTERVAL):
+        self.board = board
+        self.interval = interval
+        self.ply = 0
+        self._line = []
+        self._start_count = board.move_count
+        self._checkpoints = {0: CompactPosition.from_board(board).to_bytes()}
+        self._anchor_ply = 0
+
+    def __len__(self):
+        return len(self._line)
+
+    def moves(self):
+        """Возвращает ходы линии до текущего полухода в виде пар (from_pos, to_pos)."""
+        return [(from_pos, to_pos) for from_pos, to_pos, _ in self._line[:self.ply]]
+
+    def push(self, move):
+        """Записывает ход, только что сделанный на доске; отмененные ходы после него отбрасываются.
+
+        Args:
+            move (Move): Последний ход из board.move_history.
+        """
+        if self.ply < len(self._line):
+            del self._line[self.ply:]
+            for ply in [ply for ply in self._checkpoints if ply > self.ply]:
+                del self._checkpoints[ply]
+        self._line.append((move.from_pos, move.to_pos, type(move.promoted_to) if move.promoted_to else None))
+        self.ply += 1
+        self._remember_checkpoint()
+
+    def undo(self, n=1):
+        """Отменяет n полуходов (или меньше, если столько не сделано).
+
+        Returns:
+            int: Сколько полуходов отменено.
+        """
+        target = max(0, self.ply - n)
+        undone = self.ply - target
+        self.goto(target)
+        return undone
+
+    def redo(self, n=1):
+        """Повторяет n отмененных полуходов (или меньше, если столько нет).
+
+        Returns:
+            int: Сколько полуходов повторено.
+        """
+        target = min(len(self._line), self.ply + n)
+        redone = target - self.ply
+        self.goto(target)
+        return redone
+
+    def goto(self, ply):
+        """Переходит к позиции после полухода ply.
+
+        Args:
+            ply (int): Номер полухода от 0 до len(timeline).
+
+        Raises:
+            ValueError: Если полуход вне линии.
+        """
+        if not 0 <= ply <= len(self._line):
+            raise ValueError(f"Полуход {ply} вне партии (0-{len(self._line)})")
+        checkpoint = max(point for point in self._checkpoints if point <= ply)
+        if ply < self.ply:
+            step_cost = self.ply - ply if ply >= self._anchor_ply else None
+        else:
+            step_cost = ply - self.ply
+        if step_cost is None or RESTORE_COST + ply - checkpoint < step_cost:
+            self._restore(checkpoint)
+        while self.ply > ply:
+            self.board.unmake_move()
+            self.ply -= 1
+        while self.ply < ply:
+            self._replay(self._line[self.ply])
+            self.ply += 1
+            self._remember_checkpoint()
+
+    def _restore(self, ply):
+        board = self.board
+        CompactPosition.from_bytes(self._checkpoints[ply]).to_board(board)
+        board.move_count = self._start_count + ply
+        self.ply = ply
+        self._anchor_ply = ply
+
+    def _replay(self, entry):
+        from_pos, to_pos, promotion = entry
+        move = self.board.create_move(from_pos, to_pos)
+        if promotion is not None and promotion is not type(move.promoted_to):
+            move.promoted_to = promotion(move.piece.color)
+        self.board.make_move(move)
+
+    def _remember_checkpoint(self):
+        if self.ply % self.interval == 0 and self.ply not in self._checkpoints:
+            self._checkpoints[self.ply] = CompactPosition.from_board(self.board).to_bytes()
@@ -0,0 +1,161 @@
+import sys
+from array import array
+
+EXACT, LOWER, UPPER = 0, 1, 2
+SLOT_BYTES = 16
+BUCKET_SLOTS = 2
+SCORE_OFFSET = 1 << 19
+DEFAULT_SIZE_MB = 16
+POSITION_SHARE = 0.25
+POSITION_ENTRY_BYTES = 120
+
+
+def _pack_squares(from_pos, to_pos):
+    return (from_pos[0] * 8 + from_pos[1]) | (to_pos[0] * 8 + to_pos[1]) << 6
+
+
+def _unpack_squares(code):
+    from_square, to_square = code & 63, code >> 6
+    return (from_square // 8, from_square % 8), (to_square // 8, to_square % 8)
+
+
+class TranspositionTable:
+    """Таблица позиций фиксированного размера для поиска и запросов о легальности.
+
+    Записи поиска (глубина, оценка, тип границы, лучший ход) хранятся в плоских
+    массивах: корзина из двух ячеек, первая заменяется только записью не меньшей
+    глубины (или записью нового поиска), вторая — всегда. Ключ — Board.hash.
+
+    Отдельно, в пределах своей доли памяти, кэшируются списки легальных ходов и
+    признак шаха для позиции; при переполнении вытесняются самые старые записи.
+
+    Args:
+        size_mb (float): Ограничение памяти в мегабайтах.
+        position_share (float): Доля памяти под кэш легальных ходов и шахов.
+    """
+
+    def __init__(self, size_mb=DEFAULT_SIZE_MB, position_share=POSITION_SHARE):
+        total = int(size_mb * (1 << 20))
+        self.buckets = max(1, int(total * (1 - position_share)) // (SLOT_BYTES * BUCKET_SLOTS))
+        self.position_limit = int(total * position_share)
+        self._keys = array("Q", bytes(8 * self.buckets * BUCKET_SLOTS))
+        self._data = array("Q", bytes(8 * self.buckets * BUCKET_SLOTS))
+        self._positions = {}
+        self._position_bytes = 0
+        self.generation = 0
+        self.probes = self.hits = self.stores = 0
+        self.position_probes = self.position_hits = 0
+
+    def new_search(self):
+        """Отмечает начало нового поиска: записи прошлых поисков можно вытеснять."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        """Очищает таблицу и кэш позиций."""
+        self._keys = array("Q", bytes(8 * len(self._keys)))
+        self._data = array("Q", bytes(8 * len(self._data)))
+        self._positions.clear()
+        self._position_bytes = 0
+        self.probes = self.hits = self.stores = 0
+        self.position_probes = self.position_hits = 0
+
+    def probe(self, key):
+        """Ищет запись поиска для позиции.
+
+        Args:
+            key (int): Ключ позиции (Board.hash).
+
+        Returns:
+            tuple or None: (глубина, оценка, тип границы, лучший ход (from_pos, to_pos) или None).
+        """
+        self.probes += 1
+        slot = (key % self.buckets) * BUCKET_SLOTS
+        for index in (slot, slot + 1):
+            if self._keys[index] == key:
+                self.hits += 1
+                data = self._data[index]
+                move = (data >> 30) & 0x1FFF
+                return ((data >> 20) & 0xFF, (data & 0xFFFFF) - SCORE_OFFSET, (data >> 28) & 3,
+                        _unpack_squares(move - 1) if move else None)
+        return None
+
+    def store(self, key, depth, score, bound, move=None):
+        """Сохраняет запись поиска.
+
+        Args:
+            key (int): Ключ позиции (Board.hash).
+            depth (int): Глубина, с которой получена оценка.
+            score (int): Оценка.
+            bound (int): EXACT, LOWER (оценка не меньше score) или UPPER (не больше).
+            move (tuple, optional): Лучший ход (from_pos, to_pos).
+        """
+        self.stores += 1
+        data = ((score + SCORE_OFFSET) | min(depth, 0xFF) << 20 | bound << 28 |
+                (_pack_squares(*move) + 1 if move else 0) << 30 | self.generation << 43)
+        slot = (key % self.buckets) * BUCKET_SLOTS
+        stored = self._data[slot]
+        if (self._keys[slot] == key or self._keys[slot] == 0 or depth >= (stored >> 20) & 0xFF
+                or (stored >> 43) & 0xFF != self.generation):
+            index = slot
+        else:
+            index = slot + 1
+        self._keys[index] = key
+        self._data[index] = data
+
+    def legal_moves(self, board):
+        """Возвращает легальные ходы ходящего игрока, используя кэш по ключу позиции.
+
+        В кэше хранятся только клетки ходов, объекты Move создаются заново через
+        board.create_move, поэтому разные посещения позиции не делят ходы.
+
+        Args:
+            board (Board): Доска.
+
+        Returns:
+            list: Список объектов Move.
+        """
+        entry = self._position_entry(board)
+        moves = entry[0]
+        if moves is None:
+            legal = board.generate_legal_moves(board.turn)
+            entry[0] = array("H", (_pack_squares(move.from_pos, move.to_pos) for move in legal))
+            self._position_bytes += sys.getsizeof(entry[0])
+            self._evict_positions()
+            return legal
+        self.position_hits += 1
+        return [board.create_move(*_unpack_squares(code)) for code in moves]
+
+    def is_in_check(self, board):
+        """Проверяет, под шахом ли король ходящего игрока, используя кэш по ключу позиции."""
+        entry = self._position_entry(board)
+        if entry[1] is None:
+            entry[1] = board.is_in_check(board.turn)
+        else:
+            self.position_hits += 1
+        return entry[1]
+
+    def _position_entry(self, board):
+        self.position_probes += 1
+        key = board.hash
+        entry = self._positions.get(key)
+        if entry is None:
+            entry = [None, None]
+            self._positions[key] = entry
+            self._position_bytes += POSITION_ENTRY_BYTES
+            self._evict_positions()
+        return entry
+
+    def _evict_positions(self):
+        positions = self._positions
+        while self._position_bytes > self.position_limit and len(positions) > 1:
+            entry = positions.pop(next(iter(positions)))
+            self._position_bytes -= POSITION_ENTRY_BYTES + (sys.getsizeof(entry[0]) if entry[0] is not None else 0)
+
+    @property
+    def hit_rate(self):
+        """Доля успешных обращений к записям поиска."""
+        return self.hits / self.probes if self.probes else 0
+
+    def usage(self):
+        """Доля занятых ячеек таблицы поиска."""
+        return 1 - self._keys.count(0) / len(self._keys)
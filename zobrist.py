@@ -0,0 +1,102 @@
+import random
+
+from pieces import Rook, King
+
+_piece_keys = {}
+
+SIDE_KEY = random.Random("zobrist:side").getrandbits(64)
+CASTLING_KEYS = [random.Random(f"zobrist:castling:{rights}").getrandbits(64) if rights else 0
+                 for rights in range(16)]
+EN_PASSANT_KEYS = [random.Random(f"zobrist:en_passant:{col}").getrandbits(64) for col in range(8)]
+
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+
+
+def piece_keys(piece_class, color):
+    """Возвращает 64 ключа Зобриста для фигур заданного класса и цвета.
+
+    Ключи создаются при первом обращении из генератора с зерном по имени класса,
+    поэтому одинаковы во всех процессах и для новых типов фигур.
+
+    Args:
+        piece_class (type): Класс фигуры.
+        color (str): Цвет фигуры ("white" или "black").
+
+    Returns:
+        list: Список из 64 ключей, индекс — row * 8 + col.
+    """
+    keys = _piece_keys.get((piece_class, color))
+    if keys is None:
+        rng = random.Random(f"zobrist:{piece_class.__name__}:{color}")
+        keys = [rng.getrandbits(64) for _ in range(64)]
+        _piece_keys[(piece_class, color)] = keys
+    return keys
+
+
+def piece_key(piece, row, col):
+    """Возвращает ключ Зобриста фигуры на клетке (row, col)."""
+    return piece_keys(type(piece), piece.color)[row * 8 + col]
+
+
+def castling_rights(board):
+    """Вычисляет права на рокировку по флагам has_moved короля и ладей.
+
+    Args:
+        board (Board): Доска.
+
+    Returns:
+        int: Битовая маска из WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE.
+    """
+    rights = 0
+    for row, color, kingside, queenside in ((0, "white", WHITE_KINGSIDE, WHITE_QUEENSIDE),
+                                            (7, "black", BLACK_KINGSIDE, BLACK_QUEENSIDE)):
+        king = board.grid[row][4]
+        if not isinstance(king, King) or king.color != color or king.has_moved:
+            continue
+        for col, flag in ((7, kingside), (0, queenside)):
+            rook = board.grid[row][col]
+            if isinstance(rook, Rook) and rook.color == color and not rook.has_moved:
+                rights |= flag
+    return rights
+
+
+def en_passant_file(board):
+    """Возвращает вертикаль, на которой возможно взятие на проходе.
+
+    Args:
+        board (Board): Доска.
+
+    Returns:
+        int or None: Номер столбца (0-7) или None, если взятия на проходе нет.
+    """
+    target = board.get_en_passant_target()
+    return None if target is None else target[1]
+
+
+def state_key(board):
+    """Возвращает часть ключа, зависящую от очереди хода, прав на рокировку и взятия на проходе."""
+    key = CASTLING_KEYS[castling_rights(board)]
+    ep_file = en_passant_file(board)
+    if ep_file is not None:
+        key ^= EN_PASSANT_KEYS[ep_file]
+    if board.turn == "black":
+        key ^= SIDE_KEY
+    return key
+
+
+def compute_hash(board):
+    """Вычисляет ключ Зобриста позиции с нуля (для проверки инкрементального ключа).
+
+    Args:
+        board (Board): Доска.
+
+    Returns:
+        int: 64-битный ключ позиции.
+    """
+    key = 0
+    for row in range(8):
+        for col in range(8):
+            piece = board.grid[row][col]
+            if piece is not None:
+                key ^= piece_key(piece, row, col)
+    return key ^ state_key(board)